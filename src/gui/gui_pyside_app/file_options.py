@@ -3,6 +3,28 @@ FileOptions - Lưu trữ options cho một file MKV.
 """
 from __future__ import annotations
 
+from dataclasses import asdict, dataclass
+
+
+@dataclass(slots=True)
+class SubtitleTrack:
+    """Một subtitle track đã parse từ probe."""
+    idx: int
+    lang: str
+    title: str
+    codec: str
+
+
+@dataclass(slots=True)
+class AudioTrack:
+    """Một audio track đã parse từ probe."""
+    idx: int
+    channels: int
+    lang: str
+    title: str
+    bitrate: int
+    order: int  # vị trí stream trong file (để giữ thứ tự gốc)
+
 
 class FileOptions:
     """Lưu trữ options cho một file MKV"""
@@ -14,10 +36,10 @@ class FileOptions:
         
         # Subtitle options - 2 danh sách riêng biệt
         self.export_subtitles = True  # Xuất ra file SRT
-        self.export_subtitle_indices: list[int] = []  # Track indices để xuất SRT
+        self.export_subtitle_indices: set[int] = set()  # Track indices để xuất SRT
         
         self.mux_subtitles = True  # Mux subtitle vào video output
-        self.mux_subtitle_indices: list[int] = []  # Track indices để mux
+        self.mux_subtitle_indices: set[int] = set()  # Track indices để mux
         
         # Audio options
         self.mux_audio = True
@@ -27,14 +49,22 @@ class FileOptions:
         self.rename_enabled = True
         self.custom_output_name = ""
 
+        # Cache cho get_file_config_summary - so khóa trạng thái thay vì
+        # rebuild chuỗi mỗi lần tree repaint (không cần serialize)
+        self.summary_cache: str | None = None
+        self.summary_key: tuple | None = None
+
         # Metadata caches (không cần serialize)
         self.metadata_ready = False
-        self.subtitle_meta: dict[int, dict] = {}
-        self.audio_meta: dict[int, dict] = {}
-        self.cached_subs: list[tuple] = []
-        self.cached_audios: list[tuple] = []
+        self.subtitle_meta: dict[int, SubtitleTrack] = {}
+        self.audio_meta: dict[int, AudioTrack] = {}
+        self.cached_subs: list[SubtitleTrack] = []
+        self.cached_audios: list[AudioTrack] = []
         self.cached_resolution: str = ""
         self.cached_year: str = ""
+        # (st_mtime_ns, st_size) tại thời điểm probe - file chưa đổi thì
+        # không cần re-probe
+        self.cached_stat: tuple[int, int] | None = None
 
     def to_dict(self) -> dict:
         return {
@@ -42,28 +72,60 @@ class FileOptions:
             "force_process": self.force_process,
             "process_enabled": self.process_enabled,
             "export_subtitles": self.export_subtitles,
-            "export_subtitle_indices": self.export_subtitle_indices,
+            "export_subtitle_indices": sorted(self.export_subtitle_indices),
             "mux_subtitles": self.mux_subtitles,
-            "mux_subtitle_indices": self.mux_subtitle_indices,
+            "mux_subtitle_indices": sorted(self.mux_subtitle_indices),
             "mux_audio": self.mux_audio,
             "selected_audio_indices": self.selected_audio_indices,
             "rename_enabled": self.rename_enabled,
             "custom_output_name": self.custom_output_name,
         }
 
+    def to_cache_dict(self) -> dict:
+        """Serialize đầy đủ (gồm cả metadata cache) để persist qua các lần chạy."""
+        data = self.to_dict()
+        data.update({
+            "metadata_ready": self.metadata_ready,
+            "cached_subs": [asdict(t) for t in self.cached_subs],
+            "cached_audios": [asdict(t) for t in self.cached_audios],
+            "cached_resolution": self.cached_resolution,
+            "cached_year": self.cached_year,
+        })
+        return data
+
+    @classmethod
+    def from_cache_dict(cls, data: dict) -> "FileOptions":
+        """Khôi phục từ to_cache_dict(); cache không tương thích thì bỏ metadata."""
+        options = cls.from_dict(data)
+        try:
+            options.cached_subs = [SubtitleTrack(**t) for t in data.get("cached_subs", [])]
+            options.cached_audios = [AudioTrack(**t) for t in data.get("cached_audios", [])]
+        except TypeError:
+            options.cached_subs = []
+            options.cached_audios = []
+            return options
+        options.cached_resolution = data.get("cached_resolution", "")
+        options.cached_year = data.get("cached_year", "")
+        options.subtitle_meta = {t.idx: t for t in options.cached_subs}
+        options.audio_meta = {t.idx: t for t in options.cached_audios}
+        options.metadata_ready = bool(data.get("metadata_ready", False))
+        return options
+
     @classmethod
     def from_dict(cls, data: dict) -> "FileOptions":
         options = cls(data.get("file_path", ""))
         options.force_process = data.get("force_process", False)
         options.process_enabled = data.get("process_enabled", True)
         options.export_subtitles = data.get("export_subtitles", True)
-        options.export_subtitle_indices = data.get("export_subtitle_indices", [])
+        options.export_subtitle_indices = set(data.get("export_subtitle_indices", []))
         options.mux_subtitles = data.get("mux_subtitles", True)
-        options.mux_subtitle_indices = data.get("mux_subtitle_indices", [])
+        options.mux_subtitle_indices = set(data.get("mux_subtitle_indices", []))
         options.mux_audio = data.get("mux_audio", True)
         options.selected_audio_indices = data.get("selected_audio_indices", [])
         options.rename_enabled = data.get("rename_enabled", True)
         options.custom_output_name = data.get("custom_output_name", "")
+        options.summary_cache = None
+        options.summary_key = None
         options.metadata_ready = False
         options.subtitle_meta = {}
         options.audio_meta = {}
@@ -71,4 +133,5 @@ class FileOptions:
         options.cached_audios = []
         options.cached_resolution = ""
         options.cached_year = ""
+        options.cached_stat = None
         return options
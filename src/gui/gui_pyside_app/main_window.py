@@ -7,13 +7,25 @@ from __future__ import annotations
 import importlib
 import json
 import os
+import re
 import sys
+import tempfile
+import time
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache, partial
 from pathlib import Path
 
 import requests
+from requests.adapters import HTTPAdapter, Retry
 from PySide6 import QtCore, QtGui, QtWidgets
 
+# orjson parse nhanh hơn stdlib 2-5x cho log JSON lớn; optional
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
+
 # Add src to sys.path to import mkvprocessor
 src_path = Path(__file__).parent.parent.parent
 if str(src_path) not in sys.path:
@@ -26,17 +38,405 @@ from mkvprocessor.config_manager import (
     save_user_config,
 )
 
+# Các tiền tố resolution đánh dấu file đã xử lý: 8K_, 4K_, 2K_, FHD_, HD_, 480p_
+# Compile một lần ở module scope - được gọi cho từng file trong refresh loop
+_PROCESSED_PREFIX_RE = re.compile(r"^(?:8K|4K|2K|FHD|HD|480p)_")
+
+# Dict rỗng dùng chung cho stream không có tags - tránh cấp phát {} mới
+# cho từng stream trong hot loop parse probe
+_EMPTY_TAGS: dict = {}
+
+_SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
+# Bỏ icon trạng thái (✓/❌/⏳) + khoảng trắng ở đầu tên hiển thị - một pass
+# C-level thay vì lstrip rồi strip hai lần
+_STATUS_PREFIX_RE = re.compile(r"^[✓❌⏳\s]+")
+
+
+def _strip_status_prefix(text: str) -> str:
+    return _STATUS_PREFIX_RE.sub("", text)
+
+
+# Phân loại dòng log một lần bằng regex C-level thay vì 4-5 lần scan substring
+_SRT_LOG_RE = re.compile(r"\.srt(?: \(|$)|_vie\)|_und\)")
+_PROGRESS_RE = re.compile(r"^Processing file|ĐANG XỬ LÝ")
+
+
+# Session HTTP dùng chung cho các call GitHub API - giữ TCP/TLS connection
+# giữa các lần poll thay vì handshake mới mỗi request
+_HTTP = requests.Session()
+_HTTP.mount("https://", HTTPAdapter(
+    pool_connections=2,
+    pool_maxsize=4,
+    max_retries=Retry(total=2, backoff_factor=0.3),
+))
+
+
+def _loads_json(data: bytes):
+    """Parse JSON bytes - dùng orjson nếu có, fallback stdlib."""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+# Cache parse JSON log shard theo (path, mtime_ns) - shard không đổi thì
+# refresh sau khỏi đọc/parse lại (dict ops an toàn cross-thread nhờ GIL)
+_json_log_cache: dict[str, tuple[int, object]] = {}
+
+
+def _load_json_log(path: str, mtime_ns: int):
+    """Đọc + parse một shard JSON log qua cache; None nếu lỗi."""
+    cached = _json_log_cache.get(path)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+    try:
+        with open(path, "rb") as f:
+            data = _loads_json(f.read())
+    except (ValueError, IOError) as e:
+        print(f"[WARNING] Không thể đọc {path}: {e}")
+        return None
+    _json_log_cache[path] = (mtime_ns, data)
+    return data
+
+
+# Tên viết tắt ngôn ngữ - hằng số module, không dựng lại dict mỗi lần gọi
+_LANG_MAP = {
+    'eng': 'ENG', 'vie': 'VIE', 'und': 'UNK', 'chi': 'CHI', 'zho': 'CHI',
+    'jpn': 'JPN', 'kor': 'KOR', 'fra': 'FRA', 'deu': 'DEU', 'spa': 'SPA',
+    'ita': 'ITA', 'rus': 'RUS', 'tha': 'THA', 'ind': 'IND', 'msa': 'MSA',
+}
+
+# tempfile.gettempdir() probe env + stat thư mục - tính một lần khi import
+_DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "MKVProcessor_Cache")
+
+# Fallback version khi UpdateManager không lấy được - resolve path lúc import,
+# đọc file đúng một lần mỗi process
+_VERSION_FILE = Path(__file__).resolve().parent.parent.parent.parent / "version.txt"
+
+
+@lru_cache(maxsize=1)
+def _read_version_file() -> str:
+    try:
+        return _VERSION_FILE.read_text(encoding='utf-8').strip().lstrip('vV')
+    except OSError:
+        return ""
+
+
+@lru_cache(maxsize=4096)
+def _probe_impl(file_path: str, mtime_ns: int, size: int) -> dict:
+    """Probe thực sự - mtime_ns/size chỉ dùng làm cache key."""
+    # probe_file_cached đọc từ SQLite cache trước, miss mới spawn ffprobe;
+    # minimal=True chỉ lấy các field GUI cần (JSON nhỏ hơn ~10x)
+    from mkvprocessor.probe_cache import probe_file_cached
+    return probe_file_cached(file_path, minimal=True)
+
+
+def _probe_cached(file_path: str) -> dict:
+    """Probe file qua cache keyed by (path, mtime, size).
+
+    Spawn ffprobe + parse JSON là phần đắt nhất khi refresh folder;
+    re-probe cùng file chưa đổi chỉ tốn một os.stat.
+    """
+    st = os.stat(file_path)
+    return _probe_impl(file_path, st.st_mtime_ns, st.st_size)
+
 # Hỗ trợ import khi chạy như package module hoặc chạy trực tiếp file
 try:
     from .file_options import FileOptions
     from .theme import DARK_THEME, get_status_color
     from .worker import Worker
-    from .metadata_loader import MetadataLoader
+    from .metadata_loader import MetadataLoader, parse_probe_metadata, resolution_bucket
 except ImportError:
     from file_options import FileOptions  # type: ignore
     from theme import DARK_THEME, get_status_color  # type: ignore
     from worker import Worker  # type: ignore
-    from metadata_loader import MetadataLoader  # type: ignore
+    from metadata_loader import MetadataLoader, parse_probe_metadata, resolution_bucket  # type: ignore
+
+
+class _VersionProbeSignals(QtCore.QObject):
+    """Signals cho _VersionProbe (QRunnable không thể tự có signal)."""
+    resolved = QtCore.Signal(str)  # version string ("" nếu không lấy được)
+
+
+class _VersionProbe(QtCore.QRunnable):
+    """Đọc version hiện tại trong background để không block UI thread.
+
+    `_get_update_manager()` import `requests` (nặng) và fallback đọc
+    version.txt từ disk - cả hai đều không nên chạy khi đang build tab.
+    """
+
+    def __init__(self, window: "MainWindow"):
+        super().__init__()
+        self.window = window
+        self.signals = _VersionProbeSignals()
+
+    def run(self):
+        version = ""
+        try:
+            update_manager = self.window._get_update_manager()
+            if update_manager:
+                version = update_manager.get_current_version() or ""
+            if not version or version == "unknown":
+                # Fallback: đọc trực tiếp từ version.txt (cached)
+                version = _read_version_file() or version
+        except Exception as e:
+            print(f"[WARNING] Không thể lấy version: {e}")
+        self.signals.resolved.emit(version or "unknown")
+
+
+class HistoryModel(QtCore.QAbstractTableModel):
+    """Model cho bảng lịch sử xử lý - giữ rows dưới dạng list tuple.
+
+    QTableWidget.setItem cấp phát một QTableWidgetItem và re-layout cho từng
+    cell; với model chỉ cần một lần reset cho cả batch rows.
+    """
+
+    HEADERS = ("Tên cũ", "Tên mới", "Thời gian", "Signature")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: list[tuple[str, str, str, str]] = []
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and index.isValid():
+            return self._rows[index.row()][index.column()]
+        return None
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def set_rows(self, rows: list[tuple[str, str, str, str]]):
+        """Thay toàn bộ rows trong một lần reset."""
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+
+
+class FolderScanner(QtCore.QThread):
+    """Quét folder trên worker thread: parse log xử lý + scandir + stat.
+
+    Toàn bộ phần I/O của refresh_file_list chạy ở đây để GUI không freeze
+    trên folder mạng; kết quả trả về là các tuple (name, abs_path, size).
+    """
+
+    # pending, processed: list[(name, abs_path, size)]; info: chi tiết theo tên
+    scan_finished = QtCore.Signal(list, list, dict)
+    scan_failed = QtCore.Signal(str, str)  # title, message
+
+    def __init__(self, folder: str, parent=None):
+        super().__init__(parent)
+        self.folder = folder
+
+    def run(self):
+        # Chuẩn hóa folder một lần - mọi path con thừa hưởng dạng canonical,
+        # khỏi abspath/normpath lại cho từng file
+        folder = os.path.normpath(os.path.abspath(self.folder))
+        processed_old_names = set()  # Tên file cũ đã xử lý
+        processed_new_names = set()  # Tên file mới (đã rename)
+        processed_info = {}  # Thông tin chi tiết
+
+        # 1. Đọc từ processed_files.log (format cũ)
+        log_file = os.path.join(folder, "Subtitles", "processed_files.log")
+        if os.path.exists(log_file):
+            try:
+                with open(log_file, "r", encoding="utf-8") as f:
+                    # partition thay cho split - không cấp phát list mỗi dòng
+                    for line in f:
+                        old_name, sep, rest = line.strip().partition("|")
+                        if not sep:
+                            continue
+                        new_name, _, rest = rest.partition("|")
+                        time_processed, _, _ = rest.partition("|")
+
+                        processed_old_names.add(old_name)
+                        processed_new_names.add(new_name)
+                        processed_info[old_name] = {"new": new_name, "time": time_processed}
+                        processed_info[new_name] = {"new": new_name, "time": time_processed}
+            except Exception as e:
+                print(f"[WARNING] Không thể đọc processed_files.log: {e}")
+
+        # 2. Đọc từ logs/*.json (format mới) - scandir cho mtime sẵn có,
+        # shard chưa đổi lấy từ parse cache
+        logs_dir = os.path.join(folder, "Subtitles", "logs")
+        try:
+            with os.scandir(logs_dir) as it:
+                json_entries = [e for e in it if e.name.endswith(".json")]
+        except OSError:
+            json_entries = []
+        for json_entry in json_entries:
+            try:
+                mtime_ns = json_entry.stat().st_mtime_ns
+            except OSError:
+                continue
+            entries = _load_json_log(json_entry.path, mtime_ns)
+            if isinstance(entries, list):
+                for entry in entries:
+                    old_name = entry.get("old_name", "")
+                    new_name = entry.get("new_name", "")
+                    timestamp = entry.get("timestamp", "")
+                    if old_name:
+                        processed_old_names.add(old_name)
+                        processed_info[old_name] = {"new": new_name, "time": timestamp}
+                    if new_name:
+                        processed_new_names.add(new_name)
+                        processed_info[new_name] = {"new": new_name, "time": timestamp}
+
+        # Đọc danh sách file video từ thư mục - os.scandir trả về
+        # DirEntry có stat() cache sẵn, khỏi getsize/exists riêng mỗi file
+        try:
+            with os.scandir(folder) as it:
+                all_entries = list(it)
+        except PermissionError as e:
+            self.scan_failed.emit(
+                "Lỗi quyền truy cập",
+                f"Không có quyền đọc thư mục:\n{folder}\n\nLỗi: {e}",
+            )
+            return
+        except Exception as e:
+            self.scan_failed.emit(
+                "Lỗi đọc thư mục",
+                f"Không thể đọc thư mục:\n{folder}\n\nLỗi: {e}",
+            )
+            return
+
+        print(f"[INFO] Tìm thấy {len(all_entries)} file trong thư mục: {folder}")
+
+        # str.endswith nhận tuple - một lần check trong C thay vì any() loop
+        video_files = sorted(
+            (e for e in all_entries
+             if e.name.lower().endswith(MainWindow.SUPPORTED_VIDEO_EXTENSIONS)),
+            key=lambda e: e.name,
+        )
+
+        # Phân loại: đã xử lý (có tiền tố HOẶC có trong log) vs chưa xử lý
+        # Gộp old/new names thành một frozenset - một lần hash lookup mỗi file
+        processed_names = frozenset(processed_old_names | processed_new_names)
+        pending = []
+        processed = []
+        for entry in video_files:
+            if self.isInterruptionRequested():
+                return
+            try:
+                size = entry.stat().st_size
+            except OSError as e:
+                print(f"[WARNING] Không thể đọc kích thước file {entry.name}: {e}")
+                size = -1
+            record = (entry.name, os.path.join(folder, entry.name), size)
+            if _PROCESSED_PREFIX_RE.match(entry.name) or entry.name in processed_names:
+                processed.append(record)
+            else:
+                pending.append(record)
+
+        self.scan_finished.emit(pending, processed, processed_info)
+
+
+class _MetadataProbeSignals(QtCore.QObject):
+    """Signals cho _MetadataProbeRunnable."""
+    finished = QtCore.Signal(str, object)  # file_path, payload|None
+
+
+class _MetadataProbeRunnable(QtCore.QRunnable):
+    """Probe một file trên thread pool khi user expand item."""
+
+    def __init__(self, file_path: str):
+        super().__init__()
+        self.file_path = file_path
+        self.signals = _MetadataProbeSignals()
+
+    def run(self):
+        try:
+            from mkvprocessor.probe_cache import probe_file_cached
+            payload = parse_probe_metadata(probe_file_cached(self.file_path, minimal=True))
+        except Exception as e:
+            print(f"[WARNING] Không thể đọc metadata của {os.path.basename(self.file_path)}: {e}")
+            payload = None
+        self.signals.finished.emit(self.file_path, payload)
+
+
+class SubtitleCheckListModel(QtCore.QAbstractListModel):
+    """Check-list model cho subtitle tracks - một QListView thay cho N
+    QCheckBox (mỗi QCheckBox là một QObject + style riêng, đắt khi file có
+    nhiều track). `checked` tham chiếu thẳng set trong FileOptions."""
+
+    checkedChanged = QtCore.Signal(int, bool)  # track_idx, checked
+
+    def __init__(self, entries: list[tuple[int, str]], checked: set[int], parent=None):
+        super().__init__(parent)
+        self._entries = entries  # (track_idx, label)
+        self._checked = checked
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._entries)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        idx, label = self._entries[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            return label
+        if role == QtCore.Qt.CheckStateRole:
+            return QtCore.Qt.Checked if idx in self._checked else QtCore.Qt.Unchecked
+        return None
+
+    def flags(self, index):
+        return (QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+                | QtCore.Qt.ItemIsUserCheckable)
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        if role != QtCore.Qt.CheckStateRole or not index.isValid():
+            return False
+        idx, _ = self._entries[index.row()]
+        checked = QtCore.Qt.CheckState(value) == QtCore.Qt.Checked
+        if checked:
+            self._checked.add(idx)
+        else:
+            self._checked.discard(idx)
+        self.dataChanged.emit(index, index, [QtCore.Qt.CheckStateRole])
+        self.checkedChanged.emit(idx, checked)
+        return True
+
+    def set_all(self, checked: bool):
+        """Check/uncheck toàn bộ trong một lần reset (không bắn per-row)."""
+        self.beginResetModel()
+        if checked:
+            self._checked.update(idx for idx, _ in self._entries)
+        else:
+            self._checked.clear()
+        self.endResetModel()
+
+
+class FileStatusDelegate(QtWidgets.QStyledItemDelegate):
+    """Tô màu hàng file theo status role lúc paint.
+
+    Một item.setData(STATUS_ROLE, ...) thay cho 4 lần ghi role màu per item;
+    chỉ hàng đang hiển thị mới trả chi phí tô màu.
+    """
+
+    STATUS_ROLE = QtCore.Qt.UserRole + 1
+
+    # status -> (foreground, background); parse hex một lần ở class scope
+    _COLORS = {
+        "pending": (QtGui.QColor("#facc15"), QtGui.QColor("#2f1b09")),
+        "started": (QtGui.QColor("#fb923c"), QtGui.QColor("#431407")),
+        "completed": (QtGui.QColor("#bbf7d0"), QtGui.QColor("#0f2f1a")),
+        "failed": (QtGui.QColor("#f87171"), QtGui.QColor("#431407")),
+    }
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        status = index.siblingAtColumn(0).data(self.STATUS_ROLE)
+        colors = self._COLORS.get(status)
+        if colors:
+            fg, bg = colors
+            option.palette.setColor(QtGui.QPalette.Text, fg)
+            option.palette.setColor(QtGui.QPalette.HighlightedText, fg)
+            option.backgroundBrush = QtGui.QBrush(bg)
 
 
 class DraggableListWidget(QtWidgets.QListWidget):
@@ -60,6 +460,7 @@ class MainWindow(QtWidgets.QMainWindow):
     # Supported video file extensions
     SUPPORTED_VIDEO_EXTENSIONS = (".mkv", ".mp4", ".avi", ".mov", ".m4v", ".flv", ".wmv", ".webm")
 
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("MKV Processor (PySide6)")
@@ -74,7 +475,7 @@ class MainWindow(QtWidgets.QMainWindow):
                 if hasattr(self, "folder_edit"):
                     self.folder_edit.setText(folder)
                 self.config["input_folder"] = folder
-                save_user_config(self.config)
+                self._schedule_save()
                 if hasattr(self, "refresh_file_list"):
                     self.refresh_file_list()
         self.select_folder = _select_folder_fallback
@@ -82,19 +483,86 @@ class MainWindow(QtWidgets.QMainWindow):
         self.script = None
         self._script_module_name = None
         self.worker: Worker | None = None
+        self._options_tempfile: str | None = None
         self.file_options: dict[str, FileOptions] = {}
+        # Khôi phục options + metadata đã persist từ lần chạy trước
+        # (entry có mtime không khớp bị loại ngay khi load)
+        self._load_options_cache()
         self.current_file_path: str | None = None
         self.session_log_file: Path | None = None
+        # File handle mở sẵn cho session log - không open/close mỗi dòng
+        self._session_fh = None
+        self._session_log_lines = 0
         self.log_view: QtWidgets.QPlainTextEdit | None = None
+        # Buffer cho log views - nhiều message gộp thành một lần append/layout
+        # (list.append an toàn từ background thread nhờ GIL; flush trên GUI thread)
+        self._log_buffer: list[str] = []
+        self._errors_buffer: list[str] = []
+        self._srt_buffer: list[str] = []
         self.current_selected_path: str | None = None
         self.metadata_loader_thread: QtCore.QThread | None = None  # Thread để load metadata background
         
         # Khởi tạo processing_files_map để tránh AttributeError
         self.processing_files_map: dict[str, str] = {}  # normalized_filepath -> original_filepath
+
+        # Scanner quét folder trong background cho refresh_file_list;
+        # scanner bị thay thế nhưng còn chạy được park ở đây đến khi finished
+        self._folder_scanner: FolderScanner | None = None
+        self._stale_scanners: set[FolderScanner] = set()
+
+        # Trạng thái batch update của tree (xem _tree_batch_update)
+        self._in_tree_batch = False
+        self._batch_current_item: QtWidgets.QTreeWidgetItem | None = None
+        self._batch_touched_current = False
+
+        # Cache kết quả probe hệ thống - ffmpeg gần như không đổi trong một
+        # session (15 phút), RAM poll thưa hơn (30s) vẫn đủ cho status label
+        self._ffmpeg_cache: tuple[float, bool] | None = None
+        self._ram_cache: tuple[float, float] | None = None
+
+        # HistoryManager cache theo folder: folder -> (manager, legacy_mtime, logs_mtime)
+        self._history_cache: dict[str, tuple] = {}
+        # State key của lần refresh history gần nhất - không đổi thì bỏ qua rebuild
+        self._history_state_key: tuple | None = None
+
+        # Timer coalesce update_item_summary theo file (xem update_item_summary)
+        self._summary_timers: dict[str, QtCore.QTimer] = {}
+
+        # Item đang mở (chỉ một tại một thời điểm) - đóng O(1) thay vì quét tree
+        self._expanded_item: QtWidgets.QTreeWidgetItem | None = None
+
+        # Options widget đã build - re-expand chỉ attach lại, không rebuild
+        self._options_widgets: dict[str, QtWidgets.QWidget] = {}
+
+        # Probe đang chạy cho item vừa expand: file_path -> (item, runnable)
+        self._expand_pending: dict[str, QtWidgets.QTreeWidgetItem] = {}
+        self._expand_probes: dict[str, _MetadataProbeRunnable] = {}
+
+        # Index normalized path -> tree item, build trong refresh_file_list
+        # để callback metadata tìm item bằng một dict lookup thay vì quét tree
+        self._item_by_normpath: dict[str, QtWidgets.QTreeWidgetItem] = {}
         
         # Lazy import UpdateManager - chỉ import khi cần check updates
         self.update_manager = None
         self._update_manager_imported = False
+        # Cache version đã resolve để các lần rebuild tab sau không phải I/O lại
+        self._cached_current_version: str | None = None
+        # Cache raw config cho build_settings_tab - tránh stat + đọc file
+        # mỗi lần rebuild tab; invalidate khi save_settings
+        self._raw_config_cache: dict | None = None
+
+        # Debounce ghi config - một burst thay đổi chỉ tốn một lần serialize + write
+        self._config_save_timer = QtCore.QTimer(self)
+        self._config_save_timer.setSingleShot(True)
+        self._config_save_timer.setInterval(250)
+        self._config_save_timer.timeout.connect(lambda: save_user_config(self.config))
+
+        # Summary điền theo lô sau refresh - hàng trên cùng (đang hiển thị)
+        # được điền trước, phần còn lại chạy trong idle ticks
+        self._summary_backlog: list[tuple[QtWidgets.QTreeWidgetItem, str]] = []
+        self._summary_fill_timer = QtCore.QTimer(self)
+        self._summary_fill_timer.setInterval(0)
+        self._summary_fill_timer.timeout.connect(self._fill_summary_backlog)
 
         self.build_ui()
         # Gọi apply_theme an toàn (tránh crash nếu có lỗi nhỏ về theme)
@@ -118,12 +586,76 @@ class MainWindow(QtWidgets.QMainWindow):
             lambda: getattr(self, "auto_check_for_updates", lambda: None)()
         )
     
+    def _schedule_save(self):
+        """Đặt lịch ghi config (debounced) thay vì ghi file ngay trên UI thread."""
+        self._config_save_timer.start()
+
+    def closeEvent(self, event):
+        # Flush config save còn đang chờ debounce trước khi thoát
+        if self._config_save_timer.isActive():
+            self._config_save_timer.stop()
+            save_user_config(self.config)
+        self._save_options_cache()
+        self._close_session_log()
+        # Đợi các thread quét còn chạy - thả QThread đang chạy làm Qt abort
+        for scanner in [self._folder_scanner, *self._stale_scanners]:
+            if scanner is not None and scanner.isRunning():
+                scanner.requestInterruption()
+                scanner.wait(2000)
+        if self.metadata_loader_thread and self.metadata_loader_thread.isRunning():
+            self.metadata_loader_thread.requestInterruption()
+            self.metadata_loader_thread.wait(2000)
+        super().closeEvent(event)
+
+    def _options_cache_path(self) -> Path:
+        from mkvprocessor.probe_cache import get_cache_dir
+        return get_cache_dir() / "options.json"
+
+    def _load_options_cache(self):
+        """Nạp FileOptions đã persist - launch sau có ngay metadata + lựa chọn."""
+        try:
+            data = _loads_json(self._options_cache_path().read_bytes())
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict):
+            return
+        for path, record in data.items():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue  # file đã bị xóa/di chuyển
+            if st.st_mtime_ns != record.get("mtime_ns"):
+                continue  # file đã đổi - metadata cũ không còn đúng
+            try:
+                options = FileOptions.from_cache_dict(record.get("options", {}))
+                if options.metadata_ready:
+                    options.cached_stat = (st.st_mtime_ns, st.st_size)
+                self.file_options[path] = options
+            except Exception as e:
+                print(f"[WARNING] Bỏ qua options cache của {os.path.basename(path)}: {e}")
+
+    def _save_options_cache(self):
+        """Persist FileOptions (gồm metadata cache) keyed by (path, mtime)."""
+        data = {}
+        for path, options in self.file_options.items():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            data[path] = {"mtime_ns": st.st_mtime_ns, "options": options.to_cache_dict()}
+        try:
+            self._options_cache_path().write_text(
+                json.dumps(data, ensure_ascii=False), encoding="utf-8"
+            )
+        except OSError as e:
+            print(f"[WARNING] Không thể ghi options cache: {e}")
+
     def _create_message_box(self, icon: QtWidgets.QMessageBox.Icon, title: str, text: str, 
                            buttons: QtWidgets.QMessageBox.StandardButton = QtWidgets.QMessageBox.Ok,
                            default_button: QtWidgets.QMessageBox.StandardButton | None = None) -> QtWidgets.QMessageBox:
         """Create a QMessageBox with dark theme applied."""
         msg_box = QtWidgets.QMessageBox(self)
-        msg_box.setStyleSheet(DARK_THEME)  # Apply dark theme
+        # Theme thừa hưởng từ application stylesheet (xem apply_theme)
         msg_box.setIcon(icon)
         msg_box.setWindowTitle(title)
         msg_box.setText(text)
@@ -172,7 +704,7 @@ class MainWindow(QtWidgets.QMainWindow):
                     error_msg = "[WARNING] Thư viện 'requests' chưa được cài đặt. Cài đặt bằng: pip install requests"
                     print(error_msg)
                     if self.log_view:
-                        self.log_view.appendPlainText(error_msg)
+                        self._log_buffer.append(error_msg)
                     self.update_manager = None
                     self._update_manager_imported = True
                     return None
@@ -224,7 +756,7 @@ class MainWindow(QtWidgets.QMainWindow):
                                                 log_msg = f"[INFO] Loaded UpdateManager from base_library.zip:{candidate}"
                                                 print(log_msg)
                                                 if self.log_view:
-                                                    self.log_view.appendPlainText(log_msg)
+                                                    self._log_buffer.append(log_msg)
                                                 break
                         except Exception as e:
                             print(f"[DEBUG] Failed to load UpdateManager from base_library.zip: {e}")
@@ -253,7 +785,7 @@ class MainWindow(QtWidgets.QMainWindow):
                                         log_msg = f"[INFO] Loaded UpdateManager from: {update_manager_path}"
                                         print(log_msg)
                                         if self.log_view:
-                                            self.log_view.appendPlainText(log_msg)
+                                            self._log_buffer.append(log_msg)
                                         break
                             except Exception as e:
                                 log_msg = f"[DEBUG] Failed to load from {update_manager_path}: {e}"
@@ -286,7 +818,7 @@ class MainWindow(QtWidgets.QMainWindow):
                             log_msg = "[INFO] Loaded embedded update_manager_fallback"
                             print(log_msg)
                             if self.log_view:
-                                self.log_view.appendPlainText(log_msg)
+                                self._log_buffer.append(log_msg)
                     except Exception as e:
                         print(f"[DEBUG] Failed to load embedded update_manager_fallback: {e}")
                 
@@ -300,33 +832,37 @@ class MainWindow(QtWidgets.QMainWindow):
                     debug_info += f"  sys.path: {sys.path[:5]}\n"
                     print(debug_info)
                     if self.log_view:
-                        self.log_view.appendPlainText(debug_info)
+                        self._log_buffer.append(debug_info)
                     raise ImportError(f"Cannot import UpdateManager")
                 
-                self.update_manager = UpdateManager()
+                try:
+                    self.update_manager = UpdateManager(session=_HTTP)
+                except TypeError:
+                    # Bản UpdateManager cũ (load từ bundle) chưa nhận session
+                    self.update_manager = UpdateManager()
                 success_msg = "[INFO] UpdateManager đã được khởi tạo thành công"
                 print(success_msg)
                 if self.log_view:
-                    self.log_view.appendPlainText(success_msg)
+                    self._log_buffer.append(success_msg)
             except ImportError as e:
                 error_msg = f"[WARNING] UpdateManager không khả dụng (ImportError): {e}"
                 print(error_msg)
                 if self.log_view:
-                    self.log_view.appendPlainText(error_msg)
+                    self._log_buffer.append(error_msg)
                 import traceback
                 traceback.print_exc()
                 if self.log_view:
-                    self.log_view.appendPlainText(traceback.format_exc())
+                    self._log_buffer.append(traceback.format_exc())
                 self.update_manager = None
             except Exception as e:
                 error_msg = f"[WARNING] Lỗi khởi tạo UpdateManager: {e}"
                 print(error_msg)
                 if self.log_view:
-                    self.log_view.appendPlainText(error_msg)
+                    self._log_buffer.append(error_msg)
                 import traceback
                 traceback.print_exc()
                 if self.log_view:
-                    self.log_view.appendPlainText(traceback.format_exc())
+                    self._log_buffer.append(traceback.format_exc())
                 self.update_manager = None
             finally:
                 self._update_manager_imported = True
@@ -478,6 +1014,8 @@ class MainWindow(QtWidgets.QMainWindow):
         header.setSectionResizeMode(0, QtWidgets.QHeaderView.Stretch)
         header.setSectionResizeMode(1, QtWidgets.QHeaderView.ResizeToContents)
         self.file_tree.setIndentation(16)
+        # Delegate tô màu hàng theo status role (xem FileStatusDelegate)
+        self.file_tree.setItemDelegate(FileStatusDelegate(self.file_tree))
         palette = self.file_tree.palette()
         palette.setColor(QtGui.QPalette.Base, QtGui.QColor("#0f172a"))
         palette.setColor(QtGui.QPalette.Text, QtGui.QColor("#f8fafc"))
@@ -570,9 +1108,31 @@ class MainWindow(QtWidgets.QMainWindow):
         folder = self.folder_edit.text().strip()
         if folder:
             self.config["input_folder"] = folder
-            save_user_config(self.config)
+            self._schedule_save()
             self.refresh_file_list()
 
+    @property
+    def _raw_config(self) -> dict:
+        """Raw config đã cache - chỉ đọc file lần đầu hoặc sau save_settings."""
+        if self._raw_config_cache is None:
+            self._raw_config_cache = load_raw_user_config() if get_config_path().exists() else {}
+        return self._raw_config_cache
+
+    def _make_folder_row(self, cfg_key: str, placeholder: str, kind: str) -> tuple[QtWidgets.QWidget, QtWidgets.QLineEdit]:
+        """Tạo một hàng chọn thư mục: line-edit + nút browse 📁."""
+        row = QtWidgets.QWidget()
+        row_layout = QtWidgets.QHBoxLayout(row)
+        row_layout.setContentsMargins(0, 0, 0, 0)
+        row_layout.setSpacing(4)
+        edit = QtWidgets.QLineEdit(self.config.get(cfg_key, ""))
+        edit.setPlaceholderText(placeholder)
+        row_layout.addWidget(edit, 1)
+        browse_btn = QtWidgets.QToolButton()
+        browse_btn.setText("📁")
+        browse_btn.clicked.connect(partial(self._browse_output_folder, kind))
+        row_layout.addWidget(browse_btn)
+        return row, edit
+
     def build_settings_tab(self):
         tab = QtWidgets.QWidget()
         root_layout = QtWidgets.QVBoxLayout(tab)
@@ -623,14 +1183,20 @@ class MainWindow(QtWidgets.QMainWindow):
             self.language_combo = QtWidgets.QComboBox()
             self.language_combo.setObjectName("languageCombo")
             current_lang = self.config.get("language", "vi")
-            for lang_code, lang_name in languages.items():
+            # Block signal trong lúc setup để setCurrentIndex không kích hoạt
+            # on_language_changed; chọn index một lần thay vì set lại mỗi vòng
+            self.language_combo.blockSignals(True)
+            items = list(languages.items())
+            for lang_code, lang_name in items:
                 self.language_combo.addItem(f"{lang_name} ({lang_code})", lang_code)
-                if lang_code == current_lang:
-                    self.language_combo.setCurrentIndex(self.language_combo.count() - 1)
-            # Dùng lambda để tránh lỗi nếu method được định nghĩa sau
-            self.language_combo.currentIndexChanged.connect(
-                lambda index: self.on_language_changed(index)
+            current_idx = next(
+                (i for i, (code, _) in enumerate(items) if code == current_lang), -1
             )
+            if current_idx >= 0:
+                self.language_combo.setCurrentIndex(current_idx)
+            self.language_combo.blockSignals(False)
+            # currentIndexChanged(int) đã đúng signature của on_language_changed
+            self.language_combo.currentIndexChanged.connect(self.on_language_changed)
 
             lang_label = QtWidgets.QLabel("Language / Ngôn ngữ")
             lang_label.setObjectName("settingsFieldLabel")
@@ -642,11 +1208,11 @@ class MainWindow(QtWidgets.QMainWindow):
         # Checkboxes đặt thẳng hàng bên trái
         self.auto_upload_cb = QtWidgets.QCheckBox("Enable auto upload to GitHub")
         self.auto_upload_cb.setChecked(self.config.get("auto_upload", False))
-        general_form.addRow(QtWidgets.QLabel(""), self.auto_upload_cb)
+        general_form.addRow(self.auto_upload_cb)
 
         self.force_reprocess_cb = QtWidgets.QCheckBox("Always reprocess (ignore old log)")
         self.force_reprocess_cb.setChecked(self.config.get("force_reprocess", False))
-        general_form.addRow(QtWidgets.QLabel(""), self.force_reprocess_cb)
+        general_form.addRow(self.force_reprocess_cb)
 
         general_layout.addLayout(general_form)
         card_layout.addWidget(general_group)
@@ -664,7 +1230,6 @@ class MainWindow(QtWidgets.QMainWindow):
 
         output_hint = QtWidgets.QLabel("Để trống để sử dụng thư mục mặc định (theo ngôn ngữ)")
         output_hint.setObjectName("settingsHint")
-        output_hint.setStyleSheet("color: #9ca3af; font-size: 11px;")
         output_layout.addWidget(output_hint)
 
         output_form = QtWidgets.QFormLayout()
@@ -673,53 +1238,17 @@ class MainWindow(QtWidgets.QMainWindow):
         output_form.setHorizontalSpacing(24)
         output_form.setVerticalSpacing(8)
 
-        # Dubbed/Thuyết minh folder
-        dubbed_row = QtWidgets.QWidget()
-        dubbed_row_layout = QtWidgets.QHBoxLayout(dubbed_row)
-        dubbed_row_layout.setContentsMargins(0, 0, 0, 0)
-        dubbed_row_layout.setSpacing(4)
-        self.dubbed_folder_edit = QtWidgets.QLineEdit(self.config.get("output_folder_dubbed", ""))
-        self.dubbed_folder_edit.setPlaceholderText("Lồng Tiếng - Thuyết Minh")
-        dubbed_row_layout.addWidget(self.dubbed_folder_edit, 1)
-        dubbed_browse_btn = QtWidgets.QToolButton()
-        dubbed_browse_btn.setText("📁")
-        dubbed_browse_btn.clicked.connect(lambda: self._browse_output_folder("dubbed"))
-        dubbed_row_layout.addWidget(dubbed_browse_btn)
-        dubbed_label = QtWidgets.QLabel("Lồng tiếng/Thuyết minh")
-        dubbed_label.setObjectName("settingsFieldLabel")
-        output_form.addRow(dubbed_label, dubbed_row)
-
-        # Subtitles folder
-        subs_row = QtWidgets.QWidget()
-        subs_row_layout = QtWidgets.QHBoxLayout(subs_row)
-        subs_row_layout.setContentsMargins(0, 0, 0, 0)
-        subs_row_layout.setSpacing(4)
-        self.subs_folder_edit = QtWidgets.QLineEdit(self.config.get("output_folder_subtitles", ""))
-        self.subs_folder_edit.setPlaceholderText("Subtitles")
-        subs_row_layout.addWidget(self.subs_folder_edit, 1)
-        subs_browse_btn = QtWidgets.QToolButton()
-        subs_browse_btn.setText("📁")
-        subs_browse_btn.clicked.connect(lambda: self._browse_output_folder("subtitles"))
-        subs_row_layout.addWidget(subs_browse_btn)
-        subs_label = QtWidgets.QLabel("Subtitles")
-        subs_label.setObjectName("settingsFieldLabel")
-        output_form.addRow(subs_label, subs_row)
-
-        # Original folder
-        original_row = QtWidgets.QWidget()
-        original_row_layout = QtWidgets.QHBoxLayout(original_row)
-        original_row_layout.setContentsMargins(0, 0, 0, 0)
-        original_row_layout.setSpacing(4)
-        self.original_folder_edit = QtWidgets.QLineEdit(self.config.get("output_folder_original", ""))
-        self.original_folder_edit.setPlaceholderText("Original")
-        original_row_layout.addWidget(self.original_folder_edit, 1)
-        original_browse_btn = QtWidgets.QToolButton()
-        original_browse_btn.setText("📁")
-        original_browse_btn.clicked.connect(lambda: self._browse_output_folder("original"))
-        original_row_layout.addWidget(original_browse_btn)
-        original_label = QtWidgets.QLabel("Original")
-        original_label.setObjectName("settingsFieldLabel")
-        output_form.addRow(original_label, original_row)
+        # Các hàng chọn thư mục giống hệt nhau - build từ bảng thay vì copy-paste
+        for label_text, cfg_key, placeholder, kind, attr in (
+            ("Lồng tiếng/Thuyết minh", "output_folder_dubbed", "Lồng Tiếng - Thuyết Minh", "dubbed", "dubbed_folder_edit"),
+            ("Subtitles", "output_folder_subtitles", "Subtitles", "subtitles", "subs_folder_edit"),
+            ("Original", "output_folder_original", "Original", "original", "original_folder_edit"),
+        ):
+            row, edit = self._make_folder_row(cfg_key, placeholder, kind)
+            setattr(self, attr, edit)
+            label = QtWidgets.QLabel(label_text)
+            label.setObjectName("settingsFieldLabel")
+            output_form.addRow(label, row)
 
         output_layout.addLayout(output_form)
         card_layout.addWidget(output_group)
@@ -736,7 +1265,7 @@ class MainWindow(QtWidgets.QMainWindow):
         cache_layout.addWidget(cache_title)
         
         cache_desc = QtWidgets.QLabel("Copy file vào SSD để xử lý nhanh hơn, sau đó move về đích.")
-        cache_desc.setStyleSheet("color: #9ca3af; font-size: 11px;")
+        cache_desc.setObjectName("settingsHint")
         cache_layout.addWidget(cache_desc)
 
         # Checkbox Enable
@@ -750,22 +1279,10 @@ class MainWindow(QtWidgets.QMainWindow):
         cache_form.setLabelAlignment(QtCore.Qt.AlignLeft | QtCore.Qt.AlignVCenter)
         cache_form.setFormAlignment(QtCore.Qt.AlignLeft | QtCore.Qt.AlignTop)
         
-        cache_row = QtWidgets.QWidget()
-        cache_row_layout = QtWidgets.QHBoxLayout(cache_row)
-        cache_row_layout.setContentsMargins(0, 0, 0, 0)
-        cache_row_layout.setSpacing(4)
-        
-        self.cache_dir_edit = QtWidgets.QLineEdit(self.config.get("temp_cache_dir", ""))
-        import tempfile
-        default_temp = os.path.join(tempfile.gettempdir(), "MKVProcessor_Cache")
-        self.cache_dir_edit.setPlaceholderText(f"Default: {default_temp}")
-        cache_row_layout.addWidget(self.cache_dir_edit, 1)
-        
-        cache_browse_btn = QtWidgets.QToolButton()
-        cache_browse_btn.setText("📁")
-        cache_browse_btn.clicked.connect(lambda: self._browse_output_folder("cache"))
-        cache_row_layout.addWidget(cache_browse_btn)
-        
+        cache_row, self.cache_dir_edit = self._make_folder_row(
+            "temp_cache_dir", f"Default: {_DEFAULT_CACHE_DIR}", "cache"
+        )
+
         cache_label = QtWidgets.QLabel("Cache Folder")
         cache_label.setObjectName("settingsFieldLabel")
         cache_form.addRow(cache_label, cache_row)
@@ -790,8 +1307,7 @@ class MainWindow(QtWidgets.QMainWindow):
         github_form.setHorizontalSpacing(24)
         github_form.setVerticalSpacing(8)
 
-        has_config_file = get_config_path().exists()
-        raw_config = load_raw_user_config() if has_config_file else {}
+        raw_config = self._raw_config
 
         # Repository
         self.repo_edit = QtWidgets.QLineEdit(raw_config.get("repo", ""))
@@ -845,10 +1361,10 @@ class MainWindow(QtWidgets.QMainWindow):
 
         save_btn = QtWidgets.QPushButton("💾 Save")
         save_btn.setObjectName("primaryButton")
-        save_btn.clicked.connect(lambda: self.save_settings())
+        save_btn.clicked.connect(self.save_settings)
 
         test_btn = QtWidgets.QPushButton("🔄 Test")
-        test_btn.clicked.connect(lambda: self.test_token())
+        test_btn.clicked.connect(self.test_token)
 
         btn_row.addStretch()
         btn_row.addWidget(save_btn)
@@ -871,149 +1387,112 @@ class MainWindow(QtWidgets.QMainWindow):
         updates_group_layout.setContentsMargins(12, 10, 12, 12)
         updates_group_layout.setSpacing(8)
 
-        update_manager = self._get_update_manager()
-        if update_manager:
-            # Version info section (two lines)
-            version_info_layout = QtWidgets.QGridLayout()
-            version_info_layout.setHorizontalSpacing(12)
-            version_info_layout.setVerticalSpacing(6)
+        # Version info section (two lines)
+        # Không gọi _get_update_manager()/get_current_version() ở đây - import
+        # requests và đọc version.txt chạy trong _VersionProbe (background)
+        version_info_layout = QtWidgets.QGridLayout()
+        version_info_layout.setHorizontalSpacing(12)
+        version_info_layout.setVerticalSpacing(6)
+
+        self.current_version_label = QtWidgets.QLabel()
+        self.current_version_label.setTextFormat(QtCore.Qt.RichText)
+        self.current_version_label.setText(
+            "<span style='color:#9ca3af;'>Current:</span> "
+            "<span style='color:#8b949e;'>…loading</span>"
+        )
 
-            try:
-                current_version = update_manager.get_current_version()
-                if not current_version or current_version == "unknown":
-                    # Try to read from version.txt directly
-                    try:
-                        version_file = Path(__file__).parent.parent.parent.parent / "version.txt"
-                        if version_file.exists():
-                            current_version = version_file.read_text(encoding='utf-8').strip().lstrip('vV')
-                    except Exception:
-                        pass
-                
-                is_current_beta = "beta" in current_version.lower() if current_version else False
-                version_type = "Beta" if is_current_beta else "Stable"
-                version_display = current_version if current_version and current_version != "unknown" else "unknown"
-                self.current_version_label = QtWidgets.QLabel()
-                self.current_version_label.setTextFormat(QtCore.Qt.RichText)
-                self.current_version_label.setText(
-                    f"<span style='color:#9ca3af;'>Current:</span> "
-                    f"<b style='color:#58a6ff;'>{version_display}</b> "
-                    f"<span style='color:#8b949e;'>({version_type})</span>"
-                )
-                
-                # Log version to console and log view
-                version_msg = f"[INFO] Current version: {version_display} ({version_type})"
-                print(version_msg)
-                if self.log_view:
-                    self.log_view.appendPlainText(version_msg)
-            except Exception as e:
-                error_msg = f"[WARNING] Không thể lấy version: {e}"
-                print(error_msg)
-                if self.log_view:
-                    self.log_view.appendPlainText(error_msg)
-                import traceback
-                traceback.print_exc()
-                if self.log_view:
-                    self.log_view.appendPlainText(traceback.format_exc())
-                self.current_version_label = QtWidgets.QLabel(
-                    "<span style='color:#9ca3af;'>Current:</span> <b>unknown</b>"
-                )
-            
-            self.latest_version_label = QtWidgets.QLabel()
-            self.latest_version_label.setTextFormat(QtCore.Qt.RichText)
-            self.latest_version_label.setText(
-                "<span style='color:#9ca3af;'>Latest:</span> "
-                "<span style='color:#8b949e;'>Chưa kiểm tra</span>"
-            )
+        self.latest_version_label = QtWidgets.QLabel()
+        self.latest_version_label.setTextFormat(QtCore.Qt.RichText)
+        self.latest_version_label.setText(
+            "<span style='color:#9ca3af;'>Latest:</span> "
+            "<span style='color:#8b949e;'>Chưa kiểm tra</span>"
+        )
 
-            version_info_layout.addWidget(self.current_version_label, 0, 0)
-            version_info_layout.addWidget(self.latest_version_label, 1, 0)
-            version_info_layout.setColumnStretch(0, 1)
-            updates_group_layout.addLayout(version_info_layout)
-            
-            # Settings row: Release type + Auto download
-            settings_row = QtWidgets.QHBoxLayout()
-            settings_row.setSpacing(12)
-            
-            beta_label = QtWidgets.QLabel("Release type:")
-            beta_label.setObjectName("settingsFieldLabel")
-            settings_row.addWidget(beta_label)
-            
-            self.beta_stable_combo = QtWidgets.QComboBox()
-            self.beta_stable_combo.addItem("Stable", "stable")
-            self.beta_stable_combo.addItem("Beta", "beta")
-            prefer_beta = self.config.get("prefer_beta_updates", False)
-            self.beta_stable_combo.setCurrentIndex(1 if prefer_beta else 0)
-            self.beta_stable_combo.currentIndexChanged.connect(self.on_beta_stable_changed)
-            settings_row.addWidget(self.beta_stable_combo)
-            
-            self.auto_download_cb = QtWidgets.QCheckBox("Auto download")
-            self.auto_download_cb.setChecked(self.config.get("auto_download_updates", False))
-            self.auto_download_cb.toggled.connect(self.on_auto_download_changed)
-            settings_row.addWidget(self.auto_download_cb)
-            
-            settings_row.addStretch()
-            updates_group_layout.addLayout(settings_row)
-
-            # Update status
-            self.update_status_label = QtWidgets.QLabel("")
-            self.update_status_label.setWordWrap(True)
-            self.update_status_label.setStyleSheet("color: #9ca3af;")
-            updates_group_layout.addWidget(self.update_status_label)
-
-            # Buttons
-            update_btn_row = QtWidgets.QHBoxLayout()
-            self.check_update_btn = QtWidgets.QPushButton("🔍 Check for Updates")
-            self.check_update_btn.clicked.connect(lambda: self.check_for_updates())
-            update_btn_row.addWidget(self.check_update_btn)
-
-            self.download_update_btn = QtWidgets.QPushButton("⬇️ Download Update")
-            self.download_update_btn.setEnabled(False)
-            self.download_update_btn.clicked.connect(lambda: self.download_update())
-            update_btn_row.addWidget(self.download_update_btn)
-            
-            self.restart_update_btn = QtWidgets.QPushButton("🔄 Restart & Update")
-            self.restart_update_btn.setEnabled(False)
-            self.restart_update_btn.setObjectName("primaryButton")
-            self.restart_update_btn.clicked.connect(lambda: self.restart_and_update())
-            update_btn_row.addWidget(self.restart_update_btn)
-
-            # Helper to toggle button states (only one active at a time)
-            def _set_update_buttons(download_enabled: bool, restart_enabled: bool):
-                self.download_update_btn.setVisible(True)
-                self.restart_update_btn.setVisible(True)
-                self.download_update_btn.setEnabled(download_enabled)
-                self.restart_update_btn.setEnabled(restart_enabled)
-                # Hide the inactive action for clarity
-                self.download_update_btn.setVisible(download_enabled)
-                self.restart_update_btn.setVisible(restart_enabled)
-
-            # Initial state: only Check enabled, others disabled/hidden
-            _set_update_buttons(download_enabled=False, restart_enabled=False)
-            self._set_update_buttons = _set_update_buttons  # store for later use
-
-            update_btn_row.addStretch()
-            updates_group_layout.addLayout(update_btn_row)
-
-            # Progress bar
-            self.update_progress_bar = QtWidgets.QProgressBar()
-            self.update_progress_bar.setVisible(False)
-            updates_group_layout.addWidget(self.update_progress_bar)
-            
-            # Track downloaded update file
-            self.downloaded_update_file: Path | None = None
+        version_info_layout.addWidget(self.current_version_label, 0, 0)
+        version_info_layout.addWidget(self.latest_version_label, 1, 0)
+        version_info_layout.setColumnStretch(0, 1)
+        updates_group_layout.addLayout(version_info_layout)
+        
+        # Settings row: Release type + Auto download
+        settings_row = QtWidgets.QHBoxLayout()
+        settings_row.setSpacing(12)
+        
+        beta_label = QtWidgets.QLabel("Release type:")
+        beta_label.setObjectName("settingsFieldLabel")
+        settings_row.addWidget(beta_label)
+        
+        self.beta_stable_combo = QtWidgets.QComboBox()
+        self.beta_stable_combo.addItem("Stable", "stable")
+        self.beta_stable_combo.addItem("Beta", "beta")
+        prefer_beta = self.config.get("prefer_beta_updates", False)
+        self.beta_stable_combo.setCurrentIndex(1 if prefer_beta else 0)
+        self.beta_stable_combo.currentIndexChanged.connect(self.on_beta_stable_changed)
+        settings_row.addWidget(self.beta_stable_combo)
+        
+        self.auto_download_cb = QtWidgets.QCheckBox("Auto download")
+        self.auto_download_cb.setChecked(self.config.get("auto_download_updates", False))
+        self.auto_download_cb.toggled.connect(self.on_auto_download_changed)
+        settings_row.addWidget(self.auto_download_cb)
+        
+        settings_row.addStretch()
+        updates_group_layout.addLayout(settings_row)
+
+        # Update status
+        self.update_status_label = QtWidgets.QLabel("")
+        self.update_status_label.setObjectName("settingsStatusHint")
+        self.update_status_label.setWordWrap(True)
+        updates_group_layout.addWidget(self.update_status_label)
+
+        # Buttons
+        update_btn_row = QtWidgets.QHBoxLayout()
+        self.check_update_btn = QtWidgets.QPushButton("🔍 Check for Updates")
+        self.check_update_btn.clicked.connect(self.check_for_updates)
+        update_btn_row.addWidget(self.check_update_btn)
+
+        self.download_update_btn = QtWidgets.QPushButton("⬇️ Download Update")
+        self.download_update_btn.setEnabled(False)
+        self.download_update_btn.clicked.connect(self.download_update)
+        update_btn_row.addWidget(self.download_update_btn)
+        
+        self.restart_update_btn = QtWidgets.QPushButton("🔄 Restart & Update")
+        self.restart_update_btn.setEnabled(False)
+        self.restart_update_btn.setObjectName("primaryButton")
+        self.restart_update_btn.clicked.connect(self.restart_and_update)
+        update_btn_row.addWidget(self.restart_update_btn)
+
+        # Helper to toggle button states (only one active at a time)
+        def _set_update_buttons(download_enabled: bool, restart_enabled: bool):
+            self.download_update_btn.setVisible(True)
+            self.restart_update_btn.setVisible(True)
+            self.download_update_btn.setEnabled(download_enabled)
+            self.restart_update_btn.setEnabled(restart_enabled)
+            # Hide the inactive action for clarity
+            self.download_update_btn.setVisible(download_enabled)
+            self.restart_update_btn.setVisible(restart_enabled)
+
+        # Initial state: only Check enabled, others disabled/hidden
+        _set_update_buttons(download_enabled=False, restart_enabled=False)
+        self._set_update_buttons = _set_update_buttons  # store for later use
+
+        update_btn_row.addStretch()
+        updates_group_layout.addLayout(update_btn_row)
+
+        # Progress bar
+        self.update_progress_bar = QtWidgets.QProgressBar()
+        self.update_progress_bar.setVisible(False)
+        updates_group_layout.addWidget(self.update_progress_bar)
+        
+        # Track downloaded update file
+        self.downloaded_update_file: Path | None = None
+
+        # Kick off background probe (hoặc dùng cache nếu tab được build lại)
+        if self._cached_current_version is not None:
+            self._apply_current_version(self._cached_current_version)
         else:
-            # Try to get more specific error message
-            error_msg = "⚠️ Update manager không khả dụng"
-            try:
-                import requests
-                error_msg += "\n\nCó thể do lỗi import module. Kiểm tra console để xem chi tiết."
-            except ImportError:
-                error_msg += "\n\nThiếu thư viện 'requests'.\nCài đặt bằng: pip install requests"
-            
-            no_update_label = QtWidgets.QLabel(error_msg)
-            no_update_label.setObjectName("settingsUpdatesHint")
-            no_update_label.setWordWrap(True)
-            updates_group_layout.addWidget(no_update_label)
+            # Giữ reference để signals không bị garbage-collect khi probe đang chạy
+            self._version_probe = _VersionProbe(self)
+            self._version_probe.signals.resolved.connect(self._on_version_probed)
+            QtCore.QThreadPool.globalInstance().start(self._version_probe)
 
         card_layout.addWidget(updates_group)
 
@@ -1023,6 +1502,32 @@ class MainWindow(QtWidgets.QMainWindow):
         settings_tab_index = self.tabs.addTab(tab, "Settings")
         return settings_tab_index
 
+    def _on_version_probed(self, version: str):
+        """Nhận kết quả từ _VersionProbe (chạy trên main thread qua signal)."""
+        self._cached_current_version = version
+        self._apply_current_version(version)
+
+        # Log version to console and log view
+        if version and version != "unknown":
+            version_type = "Beta" if "beta" in version.lower() else "Stable"
+            version_msg = f"[INFO] Current version: {version} ({version_type})"
+            print(version_msg)
+            if self.log_view:
+                self._log_buffer.append(version_msg)
+
+    def _apply_current_version(self, version: str):
+        """Cập nhật current_version_label từ version đã resolve."""
+        if not hasattr(self, 'current_version_label'):
+            return
+        is_current_beta = "beta" in version.lower() if version else False
+        version_type = "Beta" if is_current_beta else "Stable"
+        version_display = version if version and version != "unknown" else "unknown"
+        self.current_version_label.setText(
+            f"<span style='color:#9ca3af;'>Current:</span> "
+            f"<b style='color:#58a6ff;'>{version_display}</b> "
+            f"<span style='color:#8b949e;'>({version_type})</span>"
+        )
+
     def toggle_token_visibility(self, checked: bool):
         """Hiện/ẩn token trong ô nhập."""
         if checked:
@@ -1038,7 +1543,7 @@ class MainWindow(QtWidgets.QMainWindow):
             if lang_code:
                 set_language(lang_code)
                 self.config["language"] = lang_code
-                save_user_config(self.config)
+                self._schedule_save()
                 # Optionally show a message that restart may be needed
                 self.settings_status.setText("Language changed. Some changes may require restart.")
         except (ImportError, AttributeError):
@@ -1084,10 +1589,18 @@ class MainWindow(QtWidgets.QMainWindow):
         
         session_layout.addLayout(session_header)
         
+        # Giới hạn số block để log chạy dài không phình bộ nhớ / chậm repaint
+        log_max_lines = int(self.config.get("log_max_lines", 5000))
+        # Một QFont dùng chung cho cả ba view - khỏi resolve font DB ba lần
+        mono_font = QtGui.QFont("Consolas", 9)
+
         self.log_view = QtWidgets.QPlainTextEdit()
         self.log_view.setReadOnly(True)
         self.log_view.setObjectName("logView")
-        self.log_view.setFont(QtGui.QFont("Consolas", 9))
+        self.log_view.setFont(mono_font)
+        self.log_view.setMaximumBlockCount(log_max_lines)
+        self.log_view.setUndoRedoEnabled(False)
+        self.log_view.setLineWrapMode(QtWidgets.QPlainTextEdit.NoWrap)
         # Add initial welcome message
         self.log_view.appendPlainText("=== MKV Processor Log ===")
         self.log_view.appendPlainText("Chờ xử lý file...")
@@ -1110,13 +1623,23 @@ class MainWindow(QtWidgets.QMainWindow):
         history_header.addWidget(refresh_history_btn)
         history_layout.addLayout(history_header)
         
-        self.history_table = QtWidgets.QTableWidget()
+        self.history_model = HistoryModel(self)
+        self.history_table = QtWidgets.QTableView()
         self.history_table.setObjectName("historyTable")
-        self.history_table.setColumnCount(4)
-        self.history_table.setHorizontalHeaderLabels(["Tên cũ", "Tên mới", "Thời gian", "Signature"])
-        self.history_table.horizontalHeader().setStretchLastSection(True)
-        self.history_table.horizontalHeader().setSectionResizeMode(0, QtWidgets.QHeaderView.Stretch)
-        self.history_table.horizontalHeader().setSectionResizeMode(1, QtWidgets.QHeaderView.Stretch)
+        self.history_table.setModel(self.history_model)
+        # Gom setup header trong một lần update - mỗi setSectionResizeMode
+        # invalidate layout riêng; cột 0/1 đã Stretch nên stretchLastSection thừa
+        header = self.history_table.horizontalHeader()
+        self.history_table.setUpdatesEnabled(False)
+        header.setSectionResizeMode(0, QtWidgets.QHeaderView.Stretch)
+        header.setSectionResizeMode(1, QtWidgets.QHeaderView.Stretch)
+        header.setSectionResizeMode(2, QtWidgets.QHeaderView.ResizeToContents)
+        # Signature: cột cố định + elide lúc paint (C++, chỉ hàng hiển thị)
+        # thay vì cắt chuỗi bằng Python cho toàn bộ history
+        header.setSectionResizeMode(3, QtWidgets.QHeaderView.Fixed)
+        self.history_table.setColumnWidth(3, 160)
+        self.history_table.setTextElideMode(QtCore.Qt.ElideRight)
+        self.history_table.setUpdatesEnabled(True)
         self.history_table.setAlternatingRowColors(True)
         self.history_table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
         self.history_table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
@@ -1142,7 +1665,10 @@ class MainWindow(QtWidgets.QMainWindow):
         self.errors_view = QtWidgets.QPlainTextEdit()
         self.errors_view.setReadOnly(True)
         self.errors_view.setObjectName("errorsView")
-        self.errors_view.setFont(QtGui.QFont("Consolas", 9))
+        self.errors_view.setFont(mono_font)
+        self.errors_view.setMaximumBlockCount(min(log_max_lines, 2000))
+        self.errors_view.setUndoRedoEnabled(False)
+        self.errors_view.setLineWrapMode(QtWidgets.QPlainTextEdit.NoWrap)
         # Style lỗi với màu đỏ
         palette = self.errors_view.palette()
         palette.setColor(QtGui.QPalette.Text, QtGui.QColor("#f87171"))
@@ -1169,7 +1695,10 @@ class MainWindow(QtWidgets.QMainWindow):
         self.srt_view = QtWidgets.QPlainTextEdit()
         self.srt_view.setReadOnly(True)
         self.srt_view.setObjectName("srtView")
-        self.srt_view.setFont(QtGui.QFont("Consolas", 9))
+        self.srt_view.setFont(mono_font)
+        self.srt_view.setMaximumBlockCount(log_max_lines)
+        self.srt_view.setUndoRedoEnabled(False)
+        self.srt_view.setLineWrapMode(QtWidgets.QPlainTextEdit.NoWrap)
         # Style SRT với màu xanh lá
         palette = self.srt_view.palette()
         palette.setColor(QtGui.QPalette.Text, QtGui.QColor("#4ade80"))
@@ -1182,115 +1711,117 @@ class MainWindow(QtWidgets.QMainWindow):
         layout.addWidget(self.log_tabs, 1)
         self.tabs.addTab(tab, "Log")
 
+        # Flush buffer mỗi 50ms - N message gộp thành một lần append/layout
+        self._log_flush_timer = QtCore.QTimer(self)
+        self._log_flush_timer.setInterval(50)
+        self._log_flush_timer.timeout.connect(self._flush_log_buffers)
+        self._log_flush_timer.start()
+
+    def _flush_log_buffers(self):
+        """Gộp các message đã buffer thành một lần appendPlainText mỗi view."""
+        # Swap buffer trước khi append để message mới (kể cả từ background
+        # thread) không bị mất giữa join và clear
+        if self._log_buffer and self.log_view:
+            pending, self._log_buffer = self._log_buffer, []
+            self.log_view.appendPlainText("\n".join(pending))
+            self.log_view.moveCursor(QtGui.QTextCursor.End)
+        if self._errors_buffer and getattr(self, 'errors_view', None):
+            pending, self._errors_buffer = self._errors_buffer, []
+            self.errors_view.appendPlainText("\n".join(pending))
+            self.errors_view.moveCursor(QtGui.QTextCursor.End)
+        if self._srt_buffer and getattr(self, 'srt_view', None):
+            pending, self._srt_buffer = self._srt_buffer, []
+            self.srt_view.appendPlainText("\n".join(pending))
+            self.srt_view.moveCursor(QtGui.QTextCursor.End)
+
     def apply_theme(self):
         self.setAcceptDrops(True)
-        self.setStyleSheet(DARK_THEME)
+        # Set stylesheet một lần ở application level - mọi widget/dialog
+        # (kể cả QMessageBox) thừa hưởng, không re-parse CSS per dialog
+        app = QtWidgets.QApplication.instance()
+        if app is not None:
+            app.setStyleSheet(DARK_THEME)
+        else:
+            self.setStyleSheet(DARK_THEME)
 
     def dragEnterEvent(self, event):
         if event.mimeData().hasUrls():
             event.acceptProposedAction()
 
     def dropEvent(self, event):
-        for url in event.mimeData().urls():
-            path = url.toLocalFile()
-            if os.path.isdir(path):
-                self.folder_edit.setText(path)
-                self.config["input_folder"] = path
-                save_user_config(self.config)
-                self.refresh_file_list()
-                break
+        # Chỉ xét URL đầu tiên (một lần stat) và defer phần việc nặng
+        # (ghi config + refresh) để drop event trả về ngay
+        urls = event.mimeData().urls()
+        if not urls:
+            return
+        path = urls[0].toLocalFile()
+        if not os.path.isdir(path):
+            return
+        self.folder_edit.setText(path)
+        self.config["input_folder"] = path
+        self._schedule_save()
+        QtCore.QTimer.singleShot(0, self.refresh_file_list)
 
     def select_folder(self):
         folder = QtWidgets.QFileDialog.getExistingDirectory(self, "Chọn thư mục")
         if folder:
             self.folder_edit.setText(folder)
             self.config["input_folder"] = folder
-            save_user_config(self.config)
+            self._schedule_save()
             self.refresh_file_list()
 
-    def format_file_size(self, size_bytes: int) -> str:
-        size: float = float(size_bytes)
-        for unit in ["B", "KB", "MB", "GB"]:
-            if size < 1024:
-                return f"{size:.1f}{unit}" if unit != "B" else f"{int(size)}B"
-            size /= 1024
-        return f"{size:.1f}TB"
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def format_file_size(size_bytes: int) -> str:
+        # Không dùng self + size lặp lại nhiều trong folder lớn -> static + LRU
+        # bit_length thay cho vòng lặp chia 1024: unit index = (bits-1)//10
+        if size_bytes <= 0:
+            return "0B"
+        idx = min((size_bytes.bit_length() - 1) // 10, 4)
+        if idx == 0:
+            return f"{size_bytes}B"
+        return f"{size_bytes / (1 << (10 * idx)):.1f}{_SIZE_UNITS[idx]}"
 
     def is_already_processed_by_name(self, filename: str) -> bool:
         """Kiểm tra file đã được xử lý dựa trên tiền tố tên file"""
-        import re
-        # Các tiền tố resolution: 8K_, 4K_, 2K_, FHD_, HD_, 480p_
-        pattern = r"^(8K|4K|2K|FHD|HD|480p)_"
-        return bool(re.match(pattern, filename))
+        return _PROCESSED_PREFIX_RE.match(filename) is not None
 
-    def probe_tracks(self, file_path: str) -> tuple[list, list]:
-        from mkvprocessor.ffmpeg_helper import probe_file
+    def probe_tracks(self, probe: dict) -> tuple[list, list]:
+        """Tách subtitle/audio tracks từ một probe dict đã parse sẵn.
 
-        try:
-            probe = probe_file(file_path)
-        except Exception as e:
-            print(f"[ERROR] Không thể probe file {file_path}: {e}")
-            return [], []
-        
+        Nhận dict thay vì path để mỗi file chỉ tốn một lần probe
+        (ensure_options_metadata dùng lại cùng kết quả cho resolution).
+        """
         if "streams" not in probe:
-            print(f"[WARNING] Probe không có streams: {file_path}")
+            print("[WARNING] Probe không có streams")
             return [], []
-        
-        subs = []
-        try:
-            for stream in probe["streams"]:
-                if stream.get("codec_type") == "subtitle":
-                    subs.append((
-                        stream.get("index", -1),
-                        stream.get("tags", {}).get("language", "und"),
-                        stream.get("tags", {}).get("title", ""),
-                        stream.get("codec_name", ""),
-                    ))
-        except Exception as e:
-            print(f"[ERROR] Lỗi khi đọc subtitle tracks: {e}")
 
-        audios = []
-        try:
-            for order, stream in enumerate(probe["streams"]):
-                if stream.get("codec_type") == "audio":
-                    bitrate_raw = stream.get("bit_rate") or stream.get("tags", {}).get("BPS")
-                    try:
-                        bitrate = int(bitrate_raw) if bitrate_raw else 0
-                    except (TypeError, ValueError):
-                        bitrate = 0
-                    audios.append((
-                        stream.get("index", -1),
-                        stream.get("channels", 0),
-                        stream.get("tags", {}).get("language", "und"),
-                        stream.get("tags", {}).get("title", ""),
-                        bitrate,
-                        order,
-                    ))
-        except Exception as e:
-            print(f"[ERROR] Lỗi khi đọc audio tracks: {e}")
-            
-        return subs, audios
+        payload = parse_probe_metadata(probe)
+        return payload["subs"], payload["audios"]
 
     def ensure_options_metadata(self, file_path: str, options: FileOptions) -> bool:
-        if options.metadata_ready and options.cached_subs and options.cached_audios:
-            return True
-        
-        # Kiểm tra file có tồn tại không
-        if not os.path.exists(file_path):
+        # Kiểm tra file có tồn tại không (stat dùng luôn làm cache key)
+        try:
+            st = os.stat(file_path)
+        except OSError:
             print(f"[ERROR] File không tồn tại: {file_path}")
             options.cached_subs = []
             options.cached_audios = []
             options.cached_resolution = "?"
             options.metadata_ready = True
             return False
-            
+
+        # File chưa đổi (mtime + size khớp) -> metadata cũ vẫn đúng, khỏi probe
+        stat_key = (st.st_mtime_ns, st.st_size)
+        if options.metadata_ready and options.cached_stat == stat_key:
+            return True
+
         try:
-            from mkvprocessor.ffmpeg_helper import probe_file
             print(f"[DEBUG] Đang đọc metadata của: {os.path.basename(file_path)}")
-            probe = probe_file(file_path)
+            probe = _probe_cached(file_path)
             print(f"[DEBUG] Đã đọc probe thành công, có {len(probe.get('streams', []))} streams")
             
-            subs, audios = self.probe_tracks(file_path)
+            subs, audios = self.probe_tracks(probe)
             print(f"[DEBUG] Tìm thấy {len(subs)} subtitle tracks và {len(audios)} audio tracks")
             
             # Cache resolution - ALWAYS try to get it, even if cached_resolution exists
@@ -1340,31 +1871,18 @@ class MainWindow(QtWidgets.QMainWindow):
                             pass
                 
                 if w and h:
-                    if w >= 7680 or h >= 4320:
-                        options.cached_resolution = "8K"
-                    elif w >= 3840 or h >= 2160:
-                        options.cached_resolution = "4K"
-                    elif w >= 2560 or h >= 1440:
-                        options.cached_resolution = "2K"
-                    elif w >= 1920 or h >= 1080:
-                        options.cached_resolution = "FHD"
-                    elif w >= 1280 or h >= 720:
-                        options.cached_resolution = "HD"
-                    elif w >= 720 or h >= 480:
-                        options.cached_resolution = "480p"
-                    else:
-                        options.cached_resolution = f"{w}p"
+                    options.cached_resolution = resolution_bucket(w, h)
                     log_msg = f"[INFO] Đã lấy resolution: {options.cached_resolution} ({w}x{h}) từ {os.path.basename(file_path)}"
                     print(log_msg)
                     if self.log_view:
-                        self.log_view.appendPlainText(log_msg)
+                        self._log_buffer.append(log_msg)
                 else:
                     # Log warning if can't get resolution
                     log_msg = f"[WARNING] Không thể lấy resolution từ {os.path.basename(file_path)}: width={w}, height={h}"
                     print(log_msg)
                     if self.log_view:
-                        self.log_view.appendPlainText(log_msg)
-                        self.log_view.appendPlainText(
+                        self._log_buffer.append(log_msg)
+                        self._log_buffer.append(
                             f"[DEBUG] video_stream keys: {list(video_stream.keys())[:20]}"
                         )
                     options.cached_resolution = "unknown"
@@ -1373,8 +1891,8 @@ class MainWindow(QtWidgets.QMainWindow):
                 log_msg = f"[WARNING] Không tìm thấy video stream trong {os.path.basename(file_path)}"
                 print(log_msg)
                 if self.log_view:
-                    self.log_view.appendPlainText(log_msg)
-                    self.log_view.appendPlainText(
+                    self._log_buffer.append(log_msg)
+                    self._log_buffer.append(
                         f"[DEBUG] Streams: {[s.get('codec_type') for s in probe.get('streams', [])]}"
                     )
                 options.cached_resolution = "unknown"
@@ -1407,57 +1925,70 @@ class MainWindow(QtWidgets.QMainWindow):
 
         options.cached_subs = subs
         options.cached_audios = audios
-        options.subtitle_meta = {
-            idx: {"lang": lang, "title": title, "codec": codec}
-            for idx, lang, title, codec in subs
-        }
-        options.audio_meta = {
-            idx: {"lang": lang, "title": title, "channels": channels}
-            for idx, channels, lang, title, *_ in audios
-        }
+        options.cached_stat = stat_key
+        self._apply_track_defaults(options)
+        return True
+
+    def _apply_probe_payload(self, options: FileOptions, payload: dict):
+        """Gán payload {subs, audios, resolution, year} vào options."""
+        try:
+            st = os.stat(options.file_path)
+            options.cached_stat = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            options.cached_stat = None
+        options.cached_subs = payload["subs"]
+        options.cached_audios = payload["audios"]
+        options.cached_resolution = payload["resolution"]
+        if not options.cached_year:
+            options.cached_year = payload["year"]
+        self._apply_track_defaults(options)
+
+    def _apply_track_defaults(self, options: FileOptions):
+        """Build meta dicts + chọn track mặc định từ cached_subs/cached_audios."""
+        subs = options.cached_subs
+        audios = options.cached_audios
+        options.subtitle_meta = {t.idx: t for t in subs}
+        options.audio_meta = {t.idx: t for t in audios}
 
         if subs:
-            default_subs = [idx for idx, lang, *_ in subs if lang == "vie"] or [subs[0][0]]
+            default_subs = [t.idx for t in subs if t.lang == "vie"] or [subs[0].idx]
             if not options.export_subtitle_indices:
-                options.export_subtitle_indices = default_subs.copy()
+                options.export_subtitle_indices = set(default_subs)
             if not options.mux_subtitle_indices:
-                options.mux_subtitle_indices = default_subs.copy()
+                options.mux_subtitle_indices = set(default_subs)
         if audios and not options.selected_audio_indices:
             options.selected_audio_indices = self.pick_default_audio(audios)
 
         options.metadata_ready = True
-        return True
 
     def summarize_list(self, indices: list[int], meta: dict[int, dict], limit: int = 3, with_channels: bool = False) -> str:
         if not indices:
             return "-"
         labels: list[str] = []
+        # Bind lookup một lần - hàm này chạy cho từng item mỗi lần refresh tree
+        meta_get = meta.get
+        append = labels.append
         for idx in indices:
-            info = meta.get(idx)
-            if not info:
-                labels.append(f"#{idx}")
+            info = meta_get(idx)
+            if info is None:
+                append(f"#{idx}")
                 continue
-            lang = info.get("lang", "und").upper()
-            if with_channels:
-                ch = info.get("channels")
-                if ch:
-                    lang += f"({ch}ch)"
-            title = info.get("title")
-            if title:
-                lang += f"/{title}"
-            labels.append(lang)
+            # Một f-string duy nhất thay vì += từng đoạn (mỗi += là một
+            # string mới)
+            ch = info.channels if with_channels else None
+            title = info.title
+            append(
+                f"{info.lang.upper()}"
+                f"{f'({ch}ch)' if ch else ''}"
+                f"{f'/{title}' if title else ''}"
+            )
         if len(labels) > limit:
             return ", ".join(labels[:limit]) + "…"
         return ", ".join(labels)
 
     def get_language_abbreviation(self, language_code: str) -> str:
         """Trả về tên viết tắt của ngôn ngữ"""
-        lang_map = {
-            'eng': 'ENG', 'vie': 'VIE', 'und': 'UNK', 'chi': 'CHI', 'zho': 'CHI',
-            'jpn': 'JPN', 'kor': 'KOR', 'fra': 'FRA', 'deu': 'DEU', 'spa': 'SPA',
-            'ita': 'ITA', 'rus': 'RUS', 'tha': 'THA', 'ind': 'IND', 'msa': 'MSA',
-        }
-        return lang_map.get(language_code.lower(), language_code.upper()[:3])
+        return _LANG_MAP.get(language_code.lower()) or language_code.upper()[:3]
 
     def get_rename_preview(self, options: FileOptions) -> str:
         """Tính toán và trả về tên file mới sẽ được đổi"""
@@ -1478,10 +2009,10 @@ class MainWindow(QtWidgets.QMainWindow):
             first_audio_idx = options.selected_audio_indices[0]
             audio_info = options.audio_meta.get(first_audio_idx)
             if audio_info:
-                lang = audio_info.get("lang", "und")
+                lang = audio_info.lang
                 # Chỉ thêm lang_part nếu có language hợp lệ (không phải "und" hoặc "UNK")
                 if lang and lang.lower() != "und":
-                    title = audio_info.get("title", "")
+                    title = audio_info.title
                     lang_abbr = self.get_language_abbreviation(lang)
                     # Chỉ thêm nếu không phải UNK
                     if lang_abbr != "UNK":
@@ -1509,15 +2040,32 @@ class MainWindow(QtWidgets.QMainWindow):
         return new_name
 
     def get_file_config_summary(self, options: FileOptions) -> str:
+        # So khóa trạng thái - chỉ rebuild chuỗi khi một field liên quan đổi
+        summary_key = (
+            options.metadata_ready,
+            options.cached_resolution,
+            options.cached_year,
+            options.export_subtitles,
+            tuple(sorted(options.export_subtitle_indices)),
+            options.mux_audio,
+            options.mux_subtitles,
+            tuple(sorted(options.mux_subtitle_indices)),
+            tuple(options.selected_audio_indices),
+            options.rename_enabled,
+            bool(options.cached_subs),
+        )
+        if options.summary_cache is not None and options.summary_key == summary_key:
+            return options.summary_cache
+
         parts = []
-        
+
         # Kiểm tra có subtitle không
         has_subs = bool(options.cached_subs) or bool(options.subtitle_meta)
         
         # Xuất SRT (độc lập)
         if has_subs:
             if options.export_subtitles:
-                summary = self.summarize_list(options.export_subtitle_indices, options.subtitle_meta)
+                summary = self.summarize_list(sorted(options.export_subtitle_indices), options.subtitle_meta)
                 parts.append(f"SRT↗ {summary}")
             else:
                 parts.append("SRT↗ off")
@@ -1538,7 +2086,7 @@ class MainWindow(QtWidgets.QMainWindow):
                 mux_parts.append("Audio auto")
             
             if has_subs and options.mux_subtitles:
-                summary = self.summarize_list(options.mux_subtitle_indices, options.subtitle_meta)
+                summary = self.summarize_list(sorted(options.mux_subtitle_indices), options.subtitle_meta)
                 mux_parts.append(f"SRT→ {summary}")
             
             parts.append("Mux: " + " | ".join(mux_parts))
@@ -1551,14 +2099,18 @@ class MainWindow(QtWidgets.QMainWindow):
                 parts.append(f"Rename: {rename_preview}")
             else:
                 parts.append("Rename ✓")
-        return " | ".join(parts)
+
+        summary = " | ".join(parts)
+        options.summary_cache = summary
+        options.summary_key = summary_key
+        return summary
 
     def refresh_file_list(self):
         # Log start
         log_msg = "[INFO] Bắt đầu refresh file list..."
         print(log_msg)
         if self.log_view:
-            self.log_view.appendPlainText(log_msg)
+            self._log_buffer.append(log_msg)
         
         # Không refresh nếu đang xử lý (tránh mất trạng thái đang xử lý)
         if self.worker and self.worker.isRunning():
@@ -1574,29 +2126,22 @@ class MainWindow(QtWidgets.QMainWindow):
         
         # Cập nhật file count label để hiển thị đang refresh
         if hasattr(self, 'file_count_label'):
-            old_text = self.file_count_label.text()
             self.file_count_label.setText("Đang tải...")
-            # Force update UI ngay lập tức
-            QtWidgets.QApplication.processEvents()
         
         folder = self.folder_edit.text().strip()
         log_msg = f"[INFO] Folder được chọn: {folder}"
         print(log_msg)
         if self.log_view:
-            self.log_view.appendPlainText(log_msg)
+            self._log_buffer.append(log_msg)
         
         if not folder:
             log_msg = "[WARNING] Chưa chọn folder"
             print(log_msg)
             if self.log_view:
-                self.log_view.appendPlainText(log_msg)
-            self.file_tree.clear()
+                self._log_buffer.append(log_msg)
+            self._clear_file_tree()
             self.update_select_all_state()
-            # Re-enable nút
-            if hasattr(self, 'reload_btn'):
-                self.reload_btn.setEnabled(True)
-                self.reload_btn.setText("🔄")
-                self.reload_btn.setToolTip("Làm mới")
+            self._finish_refresh_ui()
             if hasattr(self, 'file_count_label'):
                 self.file_count_label.setText("0 file")
             return
@@ -1605,121 +2150,87 @@ class MainWindow(QtWidgets.QMainWindow):
             log_msg = f"[ERROR] Folder không tồn tại: {folder}"
             print(log_msg)
             if self.log_view:
-                self.log_view.appendPlainText(log_msg)
-            self.file_tree.clear()
+                self._log_buffer.append(log_msg)
+            self._clear_file_tree()
             self.update_select_all_state()
-            # Re-enable nút
-            if hasattr(self, 'reload_btn'):
-                self.reload_btn.setEnabled(True)
-                self.reload_btn.setText("🔄")
-                self.reload_btn.setToolTip("Làm mới")
+            self._finish_refresh_ui()
             if hasattr(self, 'file_count_label'):
                 self.file_count_label.setText("0 file")
             QtWidgets.QMessageBox.warning(self, "Lỗi", f"Folder không tồn tại:\n{folder}")
             return
 
-        try:
-            # Load processed files log (lịch sử xử lý file)
-            processed_old_names = set()  # Tên file cũ đã xử lý
-            processed_new_names = set()  # Tên file mới (đã rename)
-            processed_info = {}  # Thông tin chi tiết
-            
-            # 1. Đọc từ processed_files.log (format cũ)
-            log_file = os.path.join(folder, "Subtitles", "processed_files.log")
-            if os.path.exists(log_file):
-                try:
-                    with open(log_file, "r", encoding="utf-8") as f:
-                        for line in f:
-                            parts = line.strip().split("|")
-                            if len(parts) >= 2:
-                                old_name = parts[0]
-                                new_name = parts[1]
-                                time_processed = parts[2] if len(parts) > 2 else ""
-                                
-                                processed_old_names.add(old_name)
-                                processed_new_names.add(new_name)
-                                processed_info[old_name] = {"new": new_name, "time": time_processed}
-                                processed_info[new_name] = {"new": new_name, "time": time_processed}
-                except Exception as e:
-                    print(f"[WARNING] Không thể đọc processed_files.log: {e}")
-            
-            # 2. Đọc từ logs/*.json (format mới)
-            logs_dir = Path(folder) / "Subtitles" / "logs"
-            if logs_dir.exists():
-                for json_file in logs_dir.glob("*.json"):
-                    try:
-                        with open(json_file, "r", encoding="utf-8") as f:
-                            entries = json.load(f)
-                            if isinstance(entries, list):
-                                for entry in entries:
-                                    old_name = entry.get("old_name", "")
-                                    new_name = entry.get("new_name", "")
-                                    timestamp = entry.get("timestamp", "")
-                                    if old_name:
-                                        processed_old_names.add(old_name)
-                                        processed_info[old_name] = {"new": new_name, "time": timestamp}
-                                    if new_name:
-                                        processed_new_names.add(new_name)
-                                        processed_info[new_name] = {"new": new_name, "time": timestamp}
-                    except (json.JSONDecodeError, IOError) as e:
-                        print(f"[WARNING] Không thể đọc {json_file}: {e}")
-
-            # Đọc danh sách file video từ thư mục
+        # Toàn bộ phần I/O nặng (parse log + scandir + stat) chạy trên
+        # FolderScanner; GUI chỉ populate tree khi có kết quả
+        if self._folder_scanner and self._folder_scanner.isRunning():
+            # Không được thả reference khi thread còn chạy (Qt abort) - scan
+            # cũ trên folder mạng có thể sống quá 1s; park lại đến khi finished
+            self._folder_scanner.requestInterruption()
+            if not self._folder_scanner.wait(1000):
+                stale = self._folder_scanner
+                self._stale_scanners.add(stale)
+                stale.finished.connect(partial(self._discard_stale_scanner, stale))
+        self._folder_scanner = FolderScanner(folder)
+        self._folder_scanner.scan_finished.connect(self._on_folder_scanned)
+        self._folder_scanner.scan_failed.connect(self._on_folder_scan_failed)
+        self._folder_scanner.start()
+
+    def _clear_file_tree(self):
+        """Xóa tree cùng index/backlog đi kèm - tránh giữ item đã bị delete."""
+        self.file_tree.clear()
+        self._item_by_normpath.clear()
+        self._summary_backlog.clear()
+        self._summary_fill_timer.stop()
+        # Probe expand đang chạy trỏ vào item vừa bị delete - bỏ kết quả
+        self._expand_pending.clear()
+        # Widget options đã cache trỏ callback vào item vừa bị delete (và
+        # widget đang attach thì chính nó cũng bị clear() xóa) - bỏ hết,
+        # re-expand rebuild rẻ nhờ metadata_ready/cached_stat
+        for widget in self._options_widgets.values():
             try:
-                all_files = os.listdir(folder)
-                log_msg = f"[INFO] Tìm thấy {len(all_files)} file trong thư mục: {folder}"
-                print(log_msg)
-                if self.log_view:
-                    self.log_view.appendPlainText(log_msg)
-                
-                video_files = sorted(
-                    f for f in all_files 
-                    if any(f.lower().endswith(ext) for ext in self.SUPPORTED_VIDEO_EXTENSIONS)
-                )
-                log_msg = f"[INFO] Tìm thấy {len(video_files)} file video (hỗ trợ: {', '.join(self.SUPPORTED_VIDEO_EXTENSIONS)})"
-                print(log_msg)
-                if self.log_view:
-                    self.log_view.appendPlainText(log_msg)
-            except PermissionError as e:
-                QtWidgets.QMessageBox.warning(
-                    self, 
-                    "Lỗi quyền truy cập", 
-                    f"Không có quyền đọc thư mục:\n{folder}\n\nLỗi: {e}"
-                )
-                return
-            except Exception as e:
-                QtWidgets.QMessageBox.warning(
-                    self, 
-                    "Lỗi đọc thư mục", 
-                    f"Không thể đọc thư mục:\n{folder}\n\nLỗi: {e}"
-                )
-                return
-
-            # Phân loại: đã xử lý (có tiền tố HOẶC có trong log) vs chưa xử lý
-            processed_files = []
-            pending_files = []
-            for video_file in video_files:
-                # Check: có tiền tố resolution HOẶC có trong log (cả old_name và new_name)
-                has_prefix = self.is_already_processed_by_name(video_file)
-                in_log = video_file in processed_old_names or video_file in processed_new_names
-                
-                if has_prefix or in_log:
-                    processed_files.append(video_file)
-                else:
-                    pending_files.append(video_file)
+                widget.deleteLater()
+            except RuntimeError:
+                pass  # widget attach trên tree đã bị clear() xóa sẵn
+        self._options_widgets.clear()
+
+    def _discard_stale_scanner(self, scanner: FolderScanner):
+        """Scanner bị thay thế đã chạy xong - giờ mới được thả/xóa."""
+        self._stale_scanners.discard(scanner)
+        scanner.deleteLater()
+
+    def _finish_refresh_ui(self):
+        """Khôi phục nút reload sau khi refresh xong/lỗi."""
+        if hasattr(self, 'reload_btn'):
+            self.reload_btn.setEnabled(True)
+            self.reload_btn.setText("🔄")
+            self.reload_btn.setToolTip("Làm mới")
+
+    def _on_folder_scan_failed(self, title: str, message: str):
+        if self.sender() is not self._folder_scanner:
+            return  # kết quả của scan cũ đã bị thay
+        self._finish_refresh_ui()
+        QtWidgets.QMessageBox.warning(self, title, message)
+
+    def _on_folder_scanned(self, pending_files: list, processed_files: list, processed_info: dict):
+        """Populate tree từ kết quả FolderScanner (chạy trên GUI thread)."""
+        if self.sender() is not self._folder_scanner:
+            return  # kết quả của scan cũ đã bị thay
+
+        log_msg = f"[INFO] Tìm thấy {len(pending_files) + len(processed_files)} file video (hỗ trợ: {', '.join(self.SUPPORTED_VIDEO_EXTENSIONS)})"
+        print(log_msg)
+        if self.log_view:
+            self._log_buffer.append(log_msg)
 
+        try:
             self.file_tree.blockSignals(True)
-            self.file_tree.clear()
+            # Tắt update trong lúc đổ items - N file chỉ tốn một lần relayout
+            # khi bật lại trong finally
+            self.file_tree.setUpdatesEnabled(False)
+            self._clear_file_tree()
             
             # Hiển thị file chưa xử lý trước (màu vàng)
             # Tối ưu: Không đọc metadata ngay, chỉ hiển thị file list nhanh
             # Metadata sẽ được đọc lazy khi user expand item
-            for video_file in pending_files:
-                file_path = os.path.abspath(os.path.join(folder, video_file))
-                if not os.path.exists(file_path):
-                    print(f"[WARNING] File không tồn tại: {file_path}")
-                    continue
-                    
+            for video_file, file_path, size_bytes in pending_files:
                 options = self.file_options.setdefault(file_path, FileOptions(file_path))
 
                 # Chỉ đọc metadata nếu đã có cache (từ lần trước), không đọc mới
@@ -1731,33 +2242,25 @@ class MainWindow(QtWidgets.QMainWindow):
                     options.cached_resolution = "?"
                     options.cached_year = ""
 
-                try:
-                    size = self.format_file_size(os.path.getsize(file_path))
-                except Exception as e:
-                    print(f"[WARNING] Không thể đọc kích thước file {video_file}: {e}")
-                    size = "?"
+                size = self.format_file_size(size_bytes) if size_bytes >= 0 else "?"
                 
                 item = QtWidgets.QTreeWidgetItem(self.file_tree)
                 item.setFlags(item.flags() | QtCore.Qt.ItemIsUserCheckable)
                 item.setCheckState(0, QtCore.Qt.Checked if options.process_enabled else QtCore.Qt.Unchecked)
                 
                 item.setText(0, f"{video_file} ({size})")
-                # Hiển thị summary đơn giản nếu chưa có metadata
+                # Hiển thị summary đơn giản nếu chưa có metadata; item đã có
+                # metadata điền summary lazy theo lô (hàng hiển thị trước)
                 if options.metadata_ready:
-                    item.setText(1, self.get_file_config_summary(options))
+                    item.setText(1, "…")
+                    self._summary_backlog.append((item, file_path))
                 else:
                     item.setText(1, "Chưa load metadata...")
                 item.setData(0, QtCore.Qt.UserRole, file_path)
+                self._item_by_normpath[file_path] = item
                 
-                # Màu vàng cho file chưa xử lý
-                fg = QtGui.QColor("#facc15")
-                bg = QtGui.QColor("#2f1b09")
-                for col in range(2):
-                    # Sử dụng setData trước để đảm bảo màu được áp dụng
-                    item.setData(col, QtCore.Qt.ForegroundRole, fg)
-                    item.setData(col, QtCore.Qt.BackgroundRole, bg)
-                    item.setForeground(col, fg)
-                    item.setBackground(col, bg)
+                # Màu vàng cho file chưa xử lý - delegate đọc role này lúc paint
+                item.setData(0, FileStatusDelegate.STATUS_ROLE, "pending")
                 
                 # Placeholder for expand
                 ph = QtWidgets.QTreeWidgetItem(item)
@@ -1766,12 +2269,7 @@ class MainWindow(QtWidgets.QMainWindow):
 
             # Hiển thị file đã xử lý sau (màu xanh)
             # Tối ưu: Không đọc metadata ngay, chỉ hiển thị file list nhanh
-            for video_file in processed_files:
-                file_path = os.path.abspath(os.path.join(folder, video_file))
-                if not os.path.exists(file_path):
-                    print(f"[WARNING] File không tồn tại: {file_path}")
-                    continue
-                    
+            for video_file, file_path, size_bytes in processed_files:
                 options = self.file_options.setdefault(file_path, FileOptions(file_path))
 
                 # Chỉ đọc metadata nếu đã có cache (từ lần trước), không đọc mới
@@ -1783,11 +2281,7 @@ class MainWindow(QtWidgets.QMainWindow):
                     options.cached_resolution = "?"
                     options.cached_year = ""
 
-                try:
-                    size = self.format_file_size(os.path.getsize(file_path))
-                except Exception as e:
-                    print(f"[WARNING] Không thể đọc kích thước file {video_file}: {e}")
-                    size = "?"
+                size = self.format_file_size(size_bytes) if size_bytes >= 0 else "?"
                 
                 item = QtWidgets.QTreeWidgetItem(self.file_tree)
                 item.setFlags(item.flags() | QtCore.Qt.ItemIsUserCheckable)
@@ -1798,27 +2292,22 @@ class MainWindow(QtWidgets.QMainWindow):
                 item.setText(0, f"✓ {video_file} ({size})")
                 # Hiển thị summary đơn giản nếu chưa có metadata
                 if options.metadata_ready:
-                    item.setText(1, self.get_file_config_summary(options))
+                    item.setText(1, "…")
+                    self._summary_backlog.append((item, file_path))
                 else:
                     item.setText(1, "Đã xử lý")
                 item.setData(0, QtCore.Qt.UserRole, file_path)
+                self._item_by_normpath[file_path] = item
                 
                 # Màu xanh cho file đã xử lý
-                fg = QtGui.QColor("#bbf7d0")
-                bg = QtGui.QColor("#0f2f1a")
-                for col in range(2):
-                    # Sử dụng setData trước để đảm bảo màu được áp dụng
-                    item.setData(col, QtCore.Qt.ForegroundRole, fg)
-                    item.setData(col, QtCore.Qt.BackgroundRole, bg)
-                    item.setForeground(col, fg)
-                    item.setBackground(col, bg)
+                item.setData(0, FileStatusDelegate.STATUS_ROLE, "completed")
                 
                 # Placeholder for expand
                 ph = QtWidgets.QTreeWidgetItem(item)
                 ph.setData(0, QtCore.Qt.UserRole, "placeholder")
                 ph.setText(0, "Loading...")
 
-            self.file_count_label.setText(f"{len(processed_files)}/{len(video_files)}")
+            self.file_count_label.setText(f"{len(processed_files)}/{len(pending_files) + len(processed_files)}")
             
             # Start background metadata loader sau khi hiển thị file list
             # Lấy danh sách file paths cần load metadata
@@ -1837,6 +2326,10 @@ class MainWindow(QtWidgets.QMainWindow):
             if files_to_load_metadata:
                 self._start_metadata_loader(files_to_load_metadata)
 
+            # Điền summary cho item đã có metadata trong idle ticks
+            if self._summary_backlog:
+                self._summary_fill_timer.start()
+
         except Exception as e:
             import traceback
             error_msg = f"Lỗi khi đọc danh sách file:\n\n{str(e)}\n\n"
@@ -1844,14 +2337,28 @@ class MainWindow(QtWidgets.QMainWindow):
             print(f"[ERROR] {error_msg}")
             QtWidgets.QMessageBox.warning(self, "Lỗi", error_msg)
         finally:
+            self.file_tree.setUpdatesEnabled(True)
             self.file_tree.blockSignals(False)
             self.update_select_all_state()
-            # Re-enable nút và khôi phục icon
-            if hasattr(self, 'reload_btn'):
-                self.reload_btn.setEnabled(True)
-                self.reload_btn.setText("🔄")
-                self.reload_btn.setToolTip("Làm mới")
-    
+            self._finish_refresh_ui()
+
+    def _fill_summary_backlog(self):
+        """Điền summary theo lô 50 item mỗi tick - tree hiện ra ngay, phần
+        chuỗi tốn kém chạy sau; thứ tự backlog = thứ tự hàng nên hàng đang
+        hiển thị được điền trước."""
+        batch, self._summary_backlog = self._summary_backlog[:50], self._summary_backlog[50:]
+        for item, file_path in batch:
+            options = self.file_options.get(file_path)
+            if options is None:
+                continue
+            try:
+                item.setText(1, self.get_file_config_summary(options))
+            except RuntimeError:
+                # Item đã bị xóa (tree clear giữa chừng)
+                continue
+        if not self._summary_backlog:
+            self._summary_fill_timer.stop()
+
     def _start_metadata_loader(self, file_paths: list[str]):
         """Start background thread để load metadata cho các file."""
         # Stop loader cũ nếu đang chạy
@@ -1861,40 +2368,40 @@ class MainWindow(QtWidgets.QMainWindow):
         
         # Tạo loader mới
         self.metadata_loader_thread = MetadataLoader(file_paths)
-        self.metadata_loader_thread.metadata_loaded_signal.connect(self._on_metadata_loaded)
+        self.metadata_loader_thread.metadata_batch_loaded_signal.connect(self._on_metadata_batch_loaded)
         self.metadata_loader_thread.start()
     
-    def _on_metadata_loaded(self, file_path: str, success: bool):
+    def _on_metadata_batch_loaded(self, batch: list):
+        """Nhận một lô kết quả metadata - cập nhật tree trong một batch update."""
+        with self._tree_batch_update():
+            for file_path, payload in batch:
+                self._on_metadata_loaded(file_path, payload)
+
+    def _on_metadata_loaded(self, file_path: str, payload: object):
         """Callback khi metadata đã được load xong trong background."""
         if not file_path or file_path not in self.file_options:
             return
         
         options = self.file_options[file_path]
         
-        # Nếu chưa có metadata, load lại để cập nhật vào options
+        # Gán thẳng payload đã parse từ worker - không re-probe/re-parse
+        # trên GUI thread (probe lỗi thì payload là None, để expand retry)
         if not options.metadata_ready:
-            try:
-                self.ensure_options_metadata(file_path, options)
-            except Exception as e:
-                print(f"[WARNING] Không thể cập nhật metadata cho {os.path.basename(file_path)}: {e}")
+            if not isinstance(payload, dict):
                 return
-        
-        # Tìm item trong tree và cập nhật summary
-        normalized_filepath = os.path.normpath(os.path.abspath(file_path))
-        for i in range(self.file_tree.topLevelItemCount()):
-            item = self.file_tree.topLevelItem(i)
-            if item is None:
-                continue
-            path = item.data(0, QtCore.Qt.UserRole)
-            if not path or not isinstance(path, str):
-                continue
-            
-            item_normalized = os.path.normpath(os.path.abspath(path))
-            if item_normalized == normalized_filepath:
-                # Cập nhật summary khi metadata đã ready
-                if options.metadata_ready:
-                    item.setText(1, self.get_file_config_summary(options))
-                break
+            self._apply_probe_payload(options, payload)
+        
+        # Tìm item qua index thay vì quét toàn bộ tree (O(1) thay vì O(N)
+        # cho mỗi callback -> hết O(N^2) khi refresh cả folder); path của
+        # loader chính là path canonical đã đăng ký trong refresh
+        item = self._item_by_normpath.get(file_path)
+        if item is not None and options.metadata_ready:
+            # Cập nhật summary khi metadata đã ready
+            try:
+                item.setText(1, self.get_file_config_summary(options))
+            except RuntimeError:
+                # Item đã bị delete bởi một refresh xen giữa
+                self._item_by_normpath.pop(file_path, None)
 
     def on_file_item_clicked(self, item, column):
         """Single click - mở config khi click vào column 1 (Cấu hình)"""
@@ -1903,11 +2410,8 @@ class MainWindow(QtWidgets.QMainWindow):
             # Click vào column 1 (Cấu hình) → mở config
             # Click vào column 0 (checkbox) → chỉ toggle checkbox (qua itemChanged)
             if column == 1:
-                # Đóng tất cả các item khác trước khi mở item này
-                for i in range(self.file_tree.topLevelItemCount()):
-                    other_item = self.file_tree.topLevelItem(i)
-                    if other_item is not None and other_item != item and other_item.isExpanded():
-                        other_item.setExpanded(False)
+                # Đóng item đang mở (nếu khác) - O(1) nhờ _expanded_item
+                self._collapse_current_expanded(item)
                 
                 # Toggle expand (mở/đóng config)
                 item.setExpanded(not item.isExpanded())
@@ -1916,20 +2420,31 @@ class MainWindow(QtWidgets.QMainWindow):
         """Double click - mở/đóng config (bất kỳ column nào)"""
         path = item.data(0, QtCore.Qt.UserRole)
         if path and isinstance(path, str) and path not in ("placeholder", "options"):
-            # Đóng tất cả các item khác trước khi mở item này
-            for i in range(self.file_tree.topLevelItemCount()):
-                other_item = self.file_tree.topLevelItem(i)
-                if other_item is not None and other_item != item and other_item.isExpanded():
-                    other_item.setExpanded(False)
+            # Đóng item đang mở (nếu khác) - O(1) nhờ _expanded_item
+            self._collapse_current_expanded(item)
             
             # Toggle expand (mở/đóng config)
             item.setExpanded(not item.isExpanded())
 
+    def _collapse_current_expanded(self, except_item=None):
+        """Đóng item đang mở (nếu có và khác except_item)."""
+        if self._expanded_item is not None and self._expanded_item is not except_item:
+            try:
+                self._expanded_item.setExpanded(False)
+            except RuntimeError:
+                pass  # item đã bị delete bởi refresh
+            self._expanded_item = None
+
     def on_file_expanded(self, item):
         file_path = item.data(0, QtCore.Qt.UserRole)
         if not file_path or not isinstance(file_path, str) or not os.path.exists(file_path):
             return
 
+        # Giữ bất biến "chỉ một item mở" cho mọi đường expand (mũi tên
+        # branch, bàn phím...), không riêng gì click vào cột config
+        self._collapse_current_expanded(item)
+        self._expanded_item = item
+
         # Clear placeholder
         while item.childCount() > 0:
             child = item.child(0)
@@ -1940,18 +2455,75 @@ class MainWindow(QtWidgets.QMainWindow):
 
         options = self.file_options.setdefault(file_path, FileOptions(file_path))
 
-        # Lazy load metadata - chỉ đọc khi user expand item
-        # Đây là tối ưu quan trọng: không đọc metadata cho tất cả file ngay
+        if not options.metadata_ready:
+            # Hiển thị "Loading..." trong khi đọc metadata
+            loading_item = QtWidgets.QTreeWidgetItem(item)
+            loading_item.setData(0, QtCore.Qt.UserRole, "loading")
+            loading_item.setText(0, "⏳ Đang đọc metadata...")
+
+        # Defer phần đọc metadata + build widget qua event loop thay vì
+        # processEvents() - label loading paint xong mới chạy phần nặng,
+        # không re-enter event loop giữa chừng
+        QtCore.QTimer.singleShot(
+            0, lambda: self._on_file_expanded_load(item, file_path, options)
+        )
+
+    def _on_file_expanded_load(self, item, file_path: str, options: FileOptions):
+        """Phần nặng của expand: đọc metadata (off-thread) + build widget."""
+        try:
+            if not item.isExpanded():
+                return  # user đã collapse trước khi timer chạy
+        except RuntimeError:
+            return  # item đã bị delete bởi một refresh xen giữa
+
+        if options.metadata_ready:
+            # File đã đổi trên disk -> metadata/widget cũ không còn đúng,
+            # bỏ đi và probe lại như lần đầu
+            try:
+                st = os.stat(file_path)
+                fresh = options.cached_stat == (st.st_mtime_ns, st.st_size)
+            except OSError:
+                fresh = False
+            if fresh:
+                # Re-expand: widget cũ còn nguyên (cùng FileOptions) - attach lại
+                cached_widget = self._options_widgets.get(file_path)
+                if cached_widget is not None:
+                    self._attach_options_widget(item, cached_widget)
+                else:
+                    self._build_expand_widget(item, file_path, options)
+                return
+            self._options_widgets.pop(file_path, None)
+            options.metadata_ready = False
+
+        # Probe trên thread pool - expand không bao giờ block GUI dù
+        # ffprobe có chậm; kết quả quay về _on_expand_metadata_ready
+        self._expand_pending[file_path] = item
+        runnable = _MetadataProbeRunnable(file_path)
+        runnable.signals.finished.connect(self._on_expand_metadata_ready)
+        self._expand_probes[file_path] = runnable  # giữ reference cho signals
+        QtCore.QThreadPool.globalInstance().start(runnable)
+
+    def _on_expand_metadata_ready(self, file_path: str, payload: object):
+        item = self._expand_pending.pop(file_path, None)
+        self._expand_probes.pop(file_path, None)
+        if item is None:
+            return
+        options = self.file_options.get(file_path)
+        if options is None:
+            return
+        if isinstance(payload, dict) and not options.metadata_ready:
+            self._apply_probe_payload(options, payload)
+        try:
+            if not item.isExpanded():
+                return  # user đã collapse trong lúc probe chạy
+        except RuntimeError:
+            return
+        self._build_expand_widget(item, file_path, options)
+
+    def _build_expand_widget(self, item, file_path: str, options: FileOptions):
+        """Build + attach options widget cho item đã có metadata."""
         try:
             if not options.metadata_ready:
-                # Hiển thị "Loading..." trong khi đọc metadata
-                loading_item = QtWidgets.QTreeWidgetItem(item)
-                loading_item.setData(0, QtCore.Qt.UserRole, "loading")
-                loading_item.setText(0, "⏳ Đang đọc metadata...")
-                self.file_tree.viewport().update()
-                QtWidgets.QApplication.processEvents()  # Force update UI để hiển thị loading
-            
-            if not self.ensure_options_metadata(file_path, options):
                 raise RuntimeError("Cannot read metadata")
             
             # Xóa loading item nếu có
@@ -1968,21 +2540,44 @@ class MainWindow(QtWidgets.QMainWindow):
             item.setText(1, self.get_file_config_summary(options))
 
             widget = self.create_options_widget(file_path, subs, audios, options, item)
-            child = QtWidgets.QTreeWidgetItem(item)
-            child.setData(0, QtCore.Qt.UserRole, "options")
-            child.setFirstColumnSpanned(True)
-            self.file_tree.setItemWidget(child, 0, widget)
-            
-            # Force resize để widget hiển thị đầy đủ
-            widget.adjustSize()
-            child.setSizeHint(0, widget.sizeHint())
+            self._options_widgets[file_path] = widget
+            self._attach_options_widget(item, widget)
 
         except Exception as e:
             err = QtWidgets.QTreeWidgetItem(item)
             err.setText(0, f"❌ {e}")
-            err.setForeground(0, QtGui.QColor("#f87171"))
+            err.setForeground(0, FileStatusDelegate._COLORS["failed"][0])
+
+    def _attach_options_widget(self, item, widget: QtWidgets.QWidget):
+        """Gắn options widget vào một child row của item."""
+        child = QtWidgets.QTreeWidgetItem(item)
+        child.setData(0, QtCore.Qt.UserRole, "options")
+        child.setFirstColumnSpanned(True)
+        self.file_tree.setItemWidget(child, 0, widget)
+
+        # Defer tính sizeHint sang event loop - Qt sắp layout widget vừa
+        # attach sẵn rồi, adjustSize() đồng bộ ở đây là một pass layout thừa
+        def _apply_size_hint():
+            try:
+                child.setSizeHint(0, widget.sizeHint())
+            except RuntimeError:
+                pass  # row đã bị xóa (collapse/refresh) trước khi timer chạy
+        QtCore.QTimer.singleShot(0, _apply_size_hint)
 
     def on_file_collapsed(self, item):
+        if self._expanded_item is item:
+            self._expanded_item = None
+        # Tách options widget ra trước khi xóa child - giữ lại cho lần
+        # re-expand sau (rebuild widget tốn O(tracks))
+        file_path = item.data(0, QtCore.Qt.UserRole)
+        for i in range(item.childCount()):
+            child = item.child(i)
+            if child and child.data(0, QtCore.Qt.UserRole) == "options":
+                widget = self.file_tree.itemWidget(child, 0)
+                if widget is not None and isinstance(file_path, str):
+                    widget.setParent(None)
+                    self._options_widgets[file_path] = widget
+                break
         while item.childCount() > 0:
             item.removeChild(item.child(0))
         ph = QtWidgets.QTreeWidgetItem(item)
@@ -2001,11 +2596,20 @@ class MainWindow(QtWidgets.QMainWindow):
         """Tạo widget options với 2 danh sách SRT riêng biệt"""
         widget = QtWidgets.QWidget()
         widget.setObjectName("optionsWidget")
+        # Tắt update trong lúc đổ hàng chục checkbox/list item - một lần
+        # layout/paint khi bật lại trước khi return
+        widget.setUpdatesEnabled(False)
         widget.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
         layout = QtWidgets.QVBoxLayout(widget)
         layout.setSpacing(8)
         layout.setContentsMargins(12, 8, 12, 8)
 
+        # Label subtitle build một lần - dùng cho cả danh sách export lẫn mux
+        sub_labels = [
+            (t.idx, f"{t.lang}{f' ({t.title})' if t.title else ''} [{t.codec}]")
+            for t in subs
+        ]
+
         # Row 1: Basic toggles
         row1 = QtWidgets.QHBoxLayout()
         row1.setSpacing(16)
@@ -2032,6 +2636,7 @@ class MainWindow(QtWidgets.QMainWindow):
         
         # Kiểm tra ban đầu
         update_force_process_state()
+
         
         force_cb.toggled.connect(lambda c: setattr(options, "force_process", c))
         row1.addWidget(force_cb)
@@ -2069,49 +2674,32 @@ class MainWindow(QtWidgets.QMainWindow):
         export_header.addWidget(export_none_btn)
         export_layout.addLayout(export_header)
 
-        # Tạo scroll area cho export list để tránh scroll giật khi có nhiều subtitle
-        export_scroll = QtWidgets.QScrollArea()
-        export_scroll.setWidgetResizable(True)
-        export_scroll.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
-        export_scroll.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAsNeeded)
-        export_scroll.setMaximumHeight(300)  # Giới hạn chiều cao tối đa
-        export_scroll.setMinimumHeight(80)
-        export_scroll.setFrameShape(QtWidgets.QFrame.NoFrame)
-        
-        export_list = QtWidgets.QWidget()
-        export_list.setStyleSheet("background: #0d1117;")
-        export_list_layout = QtWidgets.QVBoxLayout(export_list)
-        export_list_layout.setSpacing(2)
-        export_list_layout.setContentsMargins(0, 0, 0, 0)
-        export_cbs = []
-        
-        for idx, lang, title, codec in subs:
-            cb = QtWidgets.QCheckBox(f"{lang}" + (f" ({title})" if title else "") + f" [{codec}]")
-            # Tự động chọn mặc định (Vietnamese hoặc đầu tiên)
-            is_default = idx in options.export_subtitle_indices
-            cb.setChecked(is_default)
-            cb.setProperty("track_index", idx)
-            cb.toggled.connect(lambda c, i=idx: (self.toggle_export_sub(options, i, c, file_path, parent_item),
-                                                  update_force_process_state()))
-            export_list_layout.addWidget(cb)
-            export_cbs.append(cb)
-        
-        export_list_layout.addStretch()  # Thêm stretch để các checkbox không bị kéo dãn
-        export_scroll.setWidget(export_list)
-        export_layout.addWidget(export_scroll)
-        
-        def select_all_export():
-            for cb in export_cbs:
-                cb.setChecked(True)
+        # Một QListView + model check-role thay vì N QCheckBox trong scroll area
+        export_model = SubtitleCheckListModel(sub_labels, options.export_subtitle_indices, widget)
+        export_view = QtWidgets.QListView()
+        export_view.setModel(export_model)
+        export_view.setStyleSheet("background: #0d1117;")
+        export_view.setMaximumHeight(300)  # Giới hạn chiều cao tối đa
+        export_view.setMinimumHeight(80)
+        export_view.setFrameShape(QtWidgets.QFrame.NoFrame)
+        export_layout.addWidget(export_view)
+
+        def on_export_checked(idx: int, checked: bool):
+            # toggle_export_sub idempotent với set - chỉ cập nhật flag + summary
+            self.toggle_export_sub(options, idx, checked, file_path, parent_item)
             update_force_process_state()
-        
-        def select_none_export():
-            for cb in export_cbs:
-                cb.setChecked(False)
+
+        export_model.checkedChanged.connect(on_export_checked)
+
+        def set_all_export(checked: bool):
+            # Một lần model reset + một lần summary thay vì per-checkbox
+            export_model.set_all(checked)
+            options.export_subtitles = bool(options.export_subtitle_indices)
+            self.update_item_summary(file_path, parent_item)
             update_force_process_state()
         
-        export_all_btn.clicked.connect(select_all_export)
-        export_none_btn.clicked.connect(select_none_export)
+        export_all_btn.clicked.connect(lambda: set_all_export(True))
+        export_none_btn.clicked.connect(lambda: set_all_export(False))
         
         sub_row.addWidget(export_group, 1)
         layout.addLayout(sub_row)
@@ -2163,21 +2751,26 @@ class MainWindow(QtWidgets.QMainWindow):
         ordered = []
         for idx in options.selected_audio_indices:
             for a in audios:
-                if a[0] == idx:
+                if a.idx == idx:
                     ordered.append(a)
                     break
         for a in audios:
-            if a[0] not in options.selected_audio_indices:
+            if a.idx not in options.selected_audio_indices:
                 ordered.append(a)
 
-        for idx, ch, lang, title, br, _ in ordered:
-            kbps = f"{br // 1000}k" if br else "?"
-            text = f"[{idx}] {lang.upper()} · {ch}ch · {kbps}" + (f" · {title}" if title else "")
+        audio_list.setUpdatesEnabled(False)
+        audio_list.blockSignals(True)
+        for track in ordered:
+            idx = track.idx
+            kbps = f"{track.bitrate // 1000}k" if track.bitrate else "?"
+            text = f"[{idx}] {track.lang.upper()} · {track.channels}ch · {kbps}" + (f" · {track.title}" if track.title else "")
             item = QtWidgets.QListWidgetItem(text)
             item.setData(QtCore.Qt.UserRole, idx)
             item.setFlags(item.flags() | QtCore.Qt.ItemIsUserCheckable)
             item.setCheckState(QtCore.Qt.Checked if idx in options.selected_audio_indices else QtCore.Qt.Unchecked)
             audio_list.addItem(item)
+        audio_list.blockSignals(False)
+        audio_list.setUpdatesEnabled(True)
 
         audio_list.setEnabled(options.mux_audio)
         audio_col_layout.addWidget(audio_list)
@@ -2202,39 +2795,29 @@ class MainWindow(QtWidgets.QMainWindow):
         srt_mux_header.addWidget(srt_mux_none_btn)
         srt_col_layout.addLayout(srt_mux_header)
 
-        # Tạo scroll area cho srt mux list để tránh scroll giật khi có nhiều subtitle
-        srt_mux_scroll = QtWidgets.QScrollArea()
-        srt_mux_scroll.setWidgetResizable(True)
-        srt_mux_scroll.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
-        srt_mux_scroll.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAsNeeded)
-        srt_mux_scroll.setMaximumHeight(300)  # Giới hạn chiều cao tối đa
-        srt_mux_scroll.setMinimumHeight(80)
-        srt_mux_scroll.setFrameShape(QtWidgets.QFrame.NoFrame)
-        
-        srt_mux_list = QtWidgets.QWidget()
-        srt_mux_list.setStyleSheet("background: #0d1117;")
-        srt_mux_list_layout = QtWidgets.QVBoxLayout(srt_mux_list)
-        srt_mux_list_layout.setSpacing(2)
-        srt_mux_list_layout.setContentsMargins(0, 0, 0, 0)
-        srt_mux_cbs = []
-        
-        for idx, lang, title, codec in subs:
-            cb = QtWidgets.QCheckBox(f"{lang}" + (f" ({title})" if title else "") + f" [{codec}]")
-            # Tự động chọn mặc định (Vietnamese hoặc đầu tiên)
-            is_default = idx in options.mux_subtitle_indices
-            cb.setChecked(is_default)
-            cb.setProperty("track_index", idx)
-            cb.toggled.connect(lambda c, i=idx: (self.toggle_mux_sub(options, i, c, file_path, parent_item),
-                                                 update_force_process_state()))
-            srt_mux_list_layout.addWidget(cb)
-            srt_mux_cbs.append(cb)
-        
-        srt_mux_list_layout.addStretch()  # Thêm stretch để các checkbox không bị kéo dãn
-        srt_mux_scroll.setWidget(srt_mux_list)
-        srt_col_layout.addWidget(srt_mux_scroll)
-        
+        srt_mux_model = SubtitleCheckListModel(sub_labels, options.mux_subtitle_indices, widget)
+        srt_mux_view = QtWidgets.QListView()
+        srt_mux_view.setModel(srt_mux_model)
+        srt_mux_view.setStyleSheet("background: #0d1117;")
+        srt_mux_view.setMaximumHeight(300)  # Giới hạn chiều cao tối đa
+        srt_mux_view.setMinimumHeight(80)
+        srt_mux_view.setFrameShape(QtWidgets.QFrame.NoFrame)
+        srt_col_layout.addWidget(srt_mux_view)
+
+        def on_mux_sub_checked(idx: int, checked: bool):
+            self.toggle_mux_sub(options, idx, checked, file_path, parent_item)
+            update_force_process_state()
+
+        srt_mux_model.checkedChanged.connect(on_mux_sub_checked)
+
+        def set_all_srt_mux(checked: bool):
+            srt_mux_model.set_all(checked)
+            options.mux_subtitles = bool(options.mux_subtitle_indices)
+            self.update_item_summary(file_path, parent_item)
+            update_force_process_state()
+
         # Enable/disable dựa trên mux_audio (không cần check mux_subtitles vì đã bỏ checkbox riêng)
-        srt_mux_scroll.setEnabled(options.mux_audio)
+        srt_mux_view.setEnabled(options.mux_audio)
         
         # Thêm 2 cột vào layout
         mux_columns.addWidget(audio_col, 1)
@@ -2244,13 +2827,16 @@ class MainWindow(QtWidgets.QMainWindow):
         def on_mux_audio_toggle(c):
             options.mux_audio = c
             audio_list.setEnabled(c)
-            srt_mux_scroll.setEnabled(c)
+            srt_mux_view.setEnabled(c)
             # Nếu tắt mux, bỏ chọn tất cả audio và SRT
             if not c:
+                audio_list.blockSignals(True)
                 for i in range(audio_list.count()):
                     audio_list.item(i).setCheckState(QtCore.Qt.Unchecked)
-                for cb in srt_mux_cbs:
-                    cb.setChecked(False)
+                audio_list.blockSignals(False)
+                self.sync_audio_from_list(options, audio_list)
+                srt_mux_model.set_all(False)
+                options.mux_subtitles = False
             self.update_item_summary(file_path, parent_item)
             update_force_process_state()
 
@@ -2264,13 +2850,13 @@ class MainWindow(QtWidgets.QMainWindow):
                 mux_audio_cb.setChecked(False)
                 options.mux_audio = False
                 audio_list.setEnabled(False)
-                srt_mux_scroll.setEnabled(False)
+                srt_mux_view.setEnabled(False)
             elif selected_count > 0 and not options.mux_audio:
                 # Tự động bật mux nếu có audio được chọn
                 mux_audio_cb.setChecked(True)
                 options.mux_audio = True
                 audio_list.setEnabled(True)
-                srt_mux_scroll.setEnabled(True)
+                srt_mux_view.setEnabled(True)
             self.update_item_summary(file_path, parent_item)
             update_force_process_state()
 
@@ -2278,33 +2864,22 @@ class MainWindow(QtWidgets.QMainWindow):
             self.sync_audio_from_list(options, audio_list)
             self.update_item_summary(file_path, parent_item)
 
-        def select_all_audio():
+        def set_all_audio(checked: bool):
+            # Một lần sync + auto-toggle mux + summary thay vì per-item
+            state = QtCore.Qt.Checked if checked else QtCore.Qt.Unchecked
+            audio_list.blockSignals(True)
             for i in range(audio_list.count()):
-                audio_list.item(i).setCheckState(QtCore.Qt.Checked)
-            update_force_process_state()
-
-        def select_none_audio():
-            for i in range(audio_list.count()):
-                audio_list.item(i).setCheckState(QtCore.Qt.Unchecked)
-            update_force_process_state()
-        
-        def select_all_srt_mux():
-            for cb in srt_mux_cbs:
-                cb.setChecked(True)
-            update_force_process_state()
-        
-        def select_none_srt_mux():
-            for cb in srt_mux_cbs:
-                cb.setChecked(False)
-            update_force_process_state()
+                audio_list.item(i).setCheckState(state)
+            audio_list.blockSignals(False)
+            on_audio_changed(None)
 
         mux_audio_cb.toggled.connect(on_mux_audio_toggle)
         audio_list.itemChanged.connect(on_audio_changed)
         audio_list.orderChanged.connect(on_audio_reorder)
-        audio_all_btn.clicked.connect(select_all_audio)
-        audio_none_btn.clicked.connect(select_none_audio)
-        srt_mux_all_btn.clicked.connect(select_all_srt_mux)
-        srt_mux_none_btn.clicked.connect(select_none_srt_mux)
+        audio_all_btn.clicked.connect(lambda: set_all_audio(True))
+        audio_none_btn.clicked.connect(lambda: set_all_audio(False))
+        srt_mux_all_btn.clicked.connect(lambda: set_all_srt_mux(True))
+        srt_mux_none_btn.clicked.connect(lambda: set_all_srt_mux(False))
         
         hint = QtWidgets.QLabel("💡 Track đầu tiên = mặc định")
         hint.setObjectName("hintLabel")
@@ -2312,26 +2887,24 @@ class MainWindow(QtWidgets.QMainWindow):
         
         layout.addWidget(mux_container)
 
+        widget.setUpdatesEnabled(True)
         return widget
 
     def toggle_export_sub(self, options: FileOptions, idx: int, checked: bool, file_path: str, parent_item):
+        # set: add/discard O(1) thay vì membership scan trên list
         if checked:
-            if idx not in options.export_subtitle_indices:
-                options.export_subtitle_indices.append(idx)
+            options.export_subtitle_indices.add(idx)
         else:
-            if idx in options.export_subtitle_indices:
-                options.export_subtitle_indices.remove(idx)
+            options.export_subtitle_indices.discard(idx)
         # Tự động cập nhật export_subtitles dựa trên có checkbox nào được chọn
         options.export_subtitles = len(options.export_subtitle_indices) > 0
         self.update_item_summary(file_path, parent_item)
 
     def toggle_mux_sub(self, options: FileOptions, idx: int, checked: bool, file_path: str, parent_item):
         if checked:
-            if idx not in options.mux_subtitle_indices:
-                options.mux_subtitle_indices.append(idx)
+            options.mux_subtitle_indices.add(idx)
         else:
-            if idx in options.mux_subtitle_indices:
-                options.mux_subtitle_indices.remove(idx)
+            options.mux_subtitle_indices.discard(idx)
         # Tự động cập nhật mux_subtitles dựa trên có checkbox nào được chọn
         options.mux_subtitles = len(options.mux_subtitle_indices) > 0
         self.update_item_summary(file_path, parent_item)
@@ -2345,34 +2918,50 @@ class MainWindow(QtWidgets.QMainWindow):
         options.selected_audio_indices = selected
 
     def update_item_summary(self, file_path: str, parent_item: QtWidgets.QTreeWidgetItem):
+        # Coalesce một burst toggle (vd nút All/None) thành một lần rebuild
+        # summary + repaint sau 16ms
+        timer = self._summary_timers.get(file_path)
+        if timer is None:
+            timer = QtCore.QTimer(self)
+            timer.setSingleShot(True)
+            timer.setInterval(16)
+            timer.timeout.connect(partial(self._do_update_item_summary, file_path, parent_item))
+            self._summary_timers[file_path] = timer
+        timer.start()
+
+    def _do_update_item_summary(self, file_path: str, parent_item: QtWidgets.QTreeWidgetItem):
+        self._summary_timers.pop(file_path, None)
         if file_path in self.file_options:
-            parent_item.setText(1, self.get_file_config_summary(self.file_options[file_path]))
+            try:
+                parent_item.setText(1, self.get_file_config_summary(self.file_options[file_path]))
+            except RuntimeError:
+                pass  # item đã bị delete bởi một refresh xen giữa
 
     def pick_default_audio(self, audios: list) -> list[int]:
         if not audios:
             return []
         
-        ordered = sorted(audios, key=lambda x: x[5])
-        first_lang = ordered[0][2]
-        
+        # Chỉ cần 3 phần tử: track đầu theo thứ tự stream, vie tốt nhất và
+        # non-vie tốt nhất - min/max chạy trong C thay vì ba lần sorted()
         def quality(a):
-            return a[1], a[4]
-        
-        vie = sorted([a for a in audios if a[2] == "vie"], key=quality, reverse=True)
-        others = sorted([a for a in audios if a[2] != "vie"], key=quality, reverse=True)
-        
-        if first_lang == "eng" and vie:
-            return [vie[0][0]]
-        if first_lang == "vie":
-            picks = [vie[0][0]] if vie else []
-            if others:
-                picks.append(others[0][0])
+            return a.channels, a.bitrate
+
+        first = min(audios, key=lambda a: a.order)
+        best_vie = max((a for a in audios if a.lang == "vie"), key=quality, default=None)
+        best_other = max((a for a in audios if a.lang != "vie"), key=quality, default=None)
+
+        if first.lang == "eng" and best_vie:
+            return [best_vie.idx]
+        if first.lang == "vie":
+            picks = [best_vie.idx] if best_vie else []
+            if best_other:
+                picks.append(best_other.idx)
             return picks
-        if vie:
-            return [vie[0][0]]
-        if others:
-            return [others[0][0]]
-        return [ordered[0][0]]
+        if best_vie:
+            return [best_vie.idx]
+        if best_other:
+            return [best_other.idx]
+        return [first.idx]
 
     def start_processing(self):
         # Đảm bảo script module đã được load
@@ -2413,10 +3002,21 @@ class MainWindow(QtWidgets.QMainWindow):
         logs_dir = Path(folder) / "Subtitles" / "logs"
         logs_dir.mkdir(parents=True, exist_ok=True)
         self.session_log_file = logs_dir / "session.log"
-        self.session_log_file.write_text("", encoding="utf-8")
-
-        # Pass options to backend via environment
-        os.environ["MKV_FILE_OPTIONS"] = json.dumps(options_data)
+        # Mở một lần (mode "w" truncate luôn) và giữ handle suốt phiên xử lý
+        # thay vì open/write/close cho từng dòng log
+        self._close_session_log()
+        self._session_fh = open(self.session_log_file, "w", encoding="utf-8", buffering=64 * 1024)
+        self._session_log_lines = 0
+
+        # Pass options to backend via temp file - env block có giới hạn
+        # kích thước và bị copy theo mỗi subprocess spawn
+        options_file = tempfile.NamedTemporaryFile(
+            "w", suffix=".json", prefix="mkv_options_", delete=False, encoding="utf-8"
+        )
+        with options_file:
+            json.dump(options_data, options_file)
+        self._options_tempfile = options_file.name
+        os.environ["MKV_FILE_OPTIONS_PATH"] = options_file.name
 
         self.worker = Worker(folder, selected)
         self.worker.log_signal.connect(self.log_message)
@@ -2444,10 +3044,34 @@ class MainWindow(QtWidgets.QMainWindow):
         self.stop_btn.setVisible(True)    # Hiện nút Dừng
         self.status_bar.showMessage(f"Processing 0/{len(selected)} files…")
 
+    def _cleanup_options_tempfile(self):
+        """Xóa file options tạm + biến môi trường sau khi xử lý xong/dừng."""
+        os.environ.pop("MKV_FILE_OPTIONS_PATH", None)
+        if self._options_tempfile:
+            try:
+                os.unlink(self._options_tempfile)
+            except OSError:
+                pass
+            self._options_tempfile = None
+
     def stop_processing(self):
         if self.worker and self.worker.isRunning():
+            # Dừng hợp tác: set cờ hủy cho backend + đợi worker thoát, thay vì
+            # terminate() giết thread giữa syscall (orphan ffmpeg, hỏng state)
             self.worker.requestInterruption()
-            self.worker.terminate()
+            try:
+                script = self._get_script_module()
+                cancel_event = getattr(script, "CANCEL_EVENT", None)
+                if cancel_event is not None:
+                    cancel_event.set()
+            except ImportError:
+                pass
+            if not self.worker.wait(5000):
+                self.status_bar.showMessage(
+                    "Đang chờ file hiện tại xử lý xong để dừng...", 5000
+                )
+        self._cleanup_options_tempfile()
+        self._close_session_log()
         self.progress.setVisible(False)
         self.start_btn.setVisible(True)   # Hiện nút Bắt đầu
         self.stop_btn.setVisible(False)  # Ẩn nút Dừng
@@ -2490,37 +3114,52 @@ class MainWindow(QtWidgets.QMainWindow):
             print(f"[WARNING] Không tìm thấy filepath cho filename: {filename}")
 
     def finish_processing(self, success: bool):
+        self._close_session_log()
         self.progress.setVisible(False)
         self.start_btn.setVisible(True)   # Hiện nút Bắt đầu
         self.stop_btn.setVisible(False)  # Ẩn nút Dừng
-        os.environ.pop("MKV_FILE_OPTIONS", None)
+        self._cleanup_options_tempfile()
         
         # Đánh dấu tất cả file còn lại trong processing_files_map là completed (nếu success)
         # File đã được đánh dấu completed trong quá trình xử lý sẽ không bị override
         if success:
-            for filepath in self.processing_files_map.values():
-                # Chỉ đánh dấu nếu file chưa được đánh dấu (tránh override failed status)
-                normalized = os.path.normpath(os.path.abspath(filepath))
-                # Kiểm tra xem file có đang ở trạng thái failed không
-                for i in range(self.file_tree.topLevelItemCount()):
-                    item = self.file_tree.topLevelItem(i)
-                    if item is None:
-                        continue
-                    path = item.data(0, QtCore.Qt.UserRole)
-                    if path and isinstance(path, str):
-                        item_normalized = os.path.normpath(os.path.abspath(path))
-                        if item_normalized == normalized:
-                            # Nếu file không có icon ❌, đánh dấu completed
-                            text = item.text(0)
-                            if not text.startswith("❌"):
-                                self.update_file_status(filepath, "completed")
-                            break
+            # Một lần repaint cho cả loạt completed thay vì mỗi file một lần;
+            # item tra qua index thay vì quét tree lồng nhau
+            with self._tree_batch_update():
+                for filepath in self.processing_files_map.values():
+                    # Chỉ đánh dấu nếu file chưa bị đánh dấu ❌ (tránh override failed)
+                    normalized = os.path.normpath(os.path.abspath(filepath))
+                    item = self._item_by_normpath.get(normalized)
+                    if item is not None and not item.text(0).startswith("❌"):
+                        self.update_file_status(filepath, "completed")
         
         self.processing_files_map.clear()
         # Refresh để cập nhật danh sách (file đã xử lý sẽ chuyển sang màu xanh)
         QtCore.QTimer.singleShot(500, self.refresh_file_list)  # Delay một chút để đảm bảo file đã được ghi log
         self.status_bar.showMessage("Completed" if success else "Error - see log", 5000)
     
+    @contextmanager
+    def _tree_batch_update(self):
+        """Gom nhiều mutation tree thành một lần repaint.
+
+        currentItem() chỉ query một lần khi vào batch; clearSelection (nếu
+        item đang chọn bị đổi màu) chạy một lần khi kết thúc.
+        """
+        self.file_tree.setUpdatesEnabled(False)
+        self._in_tree_batch = True
+        self._batch_current_item = self.file_tree.currentItem()
+        self._batch_touched_current = False
+        try:
+            yield
+        finally:
+            self._in_tree_batch = False
+            self._batch_current_item = None
+            if self._batch_touched_current:
+                self._batch_touched_current = False
+                self.file_tree.clearSelection()
+            self.file_tree.setUpdatesEnabled(True)
+            self.file_tree.viewport().update()
+
     def update_file_status(self, filepath: str, status: str):
         """Cập nhật trạng thái hiển thị của file trong tree"""
         if not filepath:
@@ -2538,28 +3177,10 @@ class MainWindow(QtWidgets.QMainWindow):
             print(f"[WARNING] File không tồn tại: {filepath}")
             return
         
-        # Tìm item trong tree theo filepath (so sánh normalized paths)
-        found_item = None
-        for i in range(self.file_tree.topLevelItemCount()):
-            item = self.file_tree.topLevelItem(i)
-            if item is None:
-                continue
-            path = item.data(0, QtCore.Qt.UserRole)
-            if not path or not isinstance(path, str):
-                continue
-            
-            # Normalize path từ tree để so sánh
-            try:
-                normalized_path = os.path.normpath(os.path.abspath(path))
-            except Exception as e:
-                print(f"[ERROR] Không thể normalize path từ tree {path}: {e}")
-                continue
-                
-            # So sánh cả normalized path và filename để tìm chính xác
-            if normalized_path == normalized_filepath or path == filepath:
-                found_item = item
-                break
-        
+        # Tìm item qua index path chuẩn hóa - O(1) thay vì quét tree mỗi
+        # status signal (hot path khi đang xử lý hàng loạt)
+        found_item = self._item_by_normpath.get(normalized_filepath)
+
         # Nếu không tìm thấy bằng path, thử tìm bằng filename
         if found_item is None:
             filename = os.path.basename(filepath)
@@ -2569,7 +3190,7 @@ class MainWindow(QtWidgets.QMainWindow):
                     continue
                 item_text = item.text(0)
                 # Loại bỏ icon và size để so sánh filename
-                item_filename = item_text.lstrip("✓❌⏳").strip()
+                item_filename = _strip_status_prefix(item_text)
                 if " (" in item_filename:
                     item_filename = item_filename.split(" (")[0]
                 if item_filename == filename or item_filename.endswith(filename):
@@ -2583,99 +3204,94 @@ class MainWindow(QtWidgets.QMainWindow):
         item = found_item
         path = item.data(0, QtCore.Qt.UserRole)
         
-        if status == "started":
-            # Màu cam cho file đang xử lý
-            fg = QtGui.QColor("#fb923c")  # Cam
-            bg = QtGui.QColor("#431407")  # Nền cam đậm
-            # Thêm icon ⏳ vào đầu tên file
-            text = item.text(0)
-            if not text.startswith("⏳"):
-                # Loại bỏ các icon cũ
-                text = text.lstrip("✓❌⏳").strip()
-                item.setText(0, f"⏳ {text}")
-        elif status == "completed":
-            # Màu xanh cho file đã xử lý
-            fg = QtGui.QColor("#bbf7d0")  # Xanh lá
-            bg = QtGui.QColor("#0f2f1a")  # Nền xanh đậm
-            # Thêm icon ✓ vào đầu tên file
-            text = item.text(0)
-            # Loại bỏ các icon cũ
-            text = text.lstrip("✓❌⏳").strip()
-            if not text.startswith("✓"):
-                item.setText(0, f"✓ {text}")
+        icons = {"started": "⏳", "completed": "✓", "failed": "❌"}
+        icon = icons.get(status)
+        if icon is None:
+            return
+
+        # Mỗi setData/setText đều khiến Qt invalidate + schedule paint kể cả
+        # khi giá trị không đổi - so sánh trước khi ghi để status report lặp
+        # lại không tốn paint nào
+        changed = False
+
+        # Thêm icon vào đầu tên file (bỏ icon cũ nếu khác)
+        text = item.text(0)
+        if not text.startswith(icon):
+            item.setText(0, f"{icon} {_strip_status_prefix(text)}")
+            changed = True
+
+        if status == "completed":
             # Bỏ chọn file đã xử lý
-            item.setCheckState(0, QtCore.Qt.Unchecked)
+            if item.checkState(0) != QtCore.Qt.Unchecked:
+                item.setCheckState(0, QtCore.Qt.Unchecked)
+                changed = True
             if path and isinstance(path, str) and path in self.file_options:
                 self.file_options[path].process_enabled = False
-        elif status == "failed":
-            # Màu đỏ cho file xử lý lỗi
-            fg = QtGui.QColor("#f87171")  # Đỏ
-            bg = QtGui.QColor("#431407")  # Nền đỏ đậm
-            # Thêm icon ❌ vào đầu tên file
-            text = item.text(0)
-            # Loại bỏ các icon cũ
-            text = text.lstrip("✓❌⏳").strip()
-            if not text.startswith("❌"):
-                item.setText(0, f"❌ {text}")
-        
-        # Áp dụng màu sắc - đảm bảo override theme
-        # Sử dụng setData trước để đảm bảo màu được áp dụng
-        for col in range(2):
-            item.setData(col, QtCore.Qt.ForegroundRole, fg)
-            item.setData(col, QtCore.Qt.BackgroundRole, bg)
-            item.setForeground(col, fg)
-            item.setBackground(col, bg)
-        
-        # Bỏ selection của item này để màu riêng được hiển thị (tránh bị override bởi selected style)
-        # Chỉ clear selection nếu item này đang được selected
-        current_item = self.file_tree.currentItem()
-        if current_item == item:
+
+        # Một lần ghi status role - delegate lo phần màu lúc paint
+        if item.data(0, FileStatusDelegate.STATUS_ROLE) != status:
+            item.setData(0, FileStatusDelegate.STATUS_ROLE, status)
+            changed = True
+
+        if not changed:
+            return
+
+        # Bỏ selection của item này để màu riêng được hiển thị (tránh bị
+        # override bởi selected style). Trong batch: so với currentItem đã
+        # query sẵn và dồn clearSelection về cuối batch
+        if self._in_tree_batch:
+            if item is self._batch_current_item:
+                self._batch_touched_current = True
+        elif self.file_tree.currentItem() == item:
             self.file_tree.clearSelection()
-        
-        # Force update UI - cần repaint để màu hiển thị
-        item.setData(0, QtCore.Qt.UserRole, path)  # Giữ lại path
-        self.file_tree.viewport().update()
-        self.file_tree.repaint()
-        QtWidgets.QApplication.processEvents()
+
+    def _close_session_log(self):
+        """Đóng handle session log nếu đang mở."""
+        if self._session_fh is not None:
+            try:
+                self._session_fh.close()
+            except Exception:
+                pass
+            self._session_fh = None
 
     def log_message(self, text: str, level: str = "INFO"):
-        if self.session_log_file:
+        if self._session_fh is not None:
             try:
-                with self.session_log_file.open("a", encoding="utf-8") as f:
-                    f.write(f"[{level}] {text}\n")
+                self._session_fh.write(f"[{level}] {text}\n")
+                self._session_log_lines += 1
+                # Flush định kỳ (và ngay khi có lỗi) để log không mất khi crash
+                if level == "ERROR" or self._session_log_lines % 100 == 0:
+                    self._session_fh.flush()
             except Exception as e:
                 # Log nhưng không crash nếu không thể ghi log
                 print(f"[WARNING] Không thể ghi log: {e}")
         
         # Phân loại log
-        is_srt_log = text.endswith('.srt') or '.srt (' in text or '_vie)' in text or '_und)' in text
+        is_srt_log = _SRT_LOG_RE.search(text) is not None
         is_error = level == "ERROR"
-        is_progress = text.startswith("Processing file") or "ĐANG XỬ LÝ" in text
+        is_progress = _PROGRESS_RE.search(text) is not None
         
         # Log SRT -> chỉ vào tab SRT, không vào Session
         if is_srt_log and hasattr(self, 'srt_view') and self.srt_view:
-            self.srt_view.appendPlainText(text.replace("[INFO] - ", ""))
-            self.srt_view.moveCursor(QtGui.QTextCursor.End)
+            self._srt_buffer.append(text.replace("[INFO] - ", ""))
             # Cập nhật counter
             if hasattr(self, 'srt_count'):
                 self.srt_count += 1
                 if hasattr(self, 'log_tabs'):
                     self.log_tabs.setTabText(3, f"📄 SRT ({self.srt_count})")
             return  # Không hiển thị trong Session
-        
+
         # Log thường -> Session
         if self.log_view:
             # Highlight progress
             if is_progress:
-                self.log_view.appendPlainText(f"▶ {text}")
+                self._log_buffer.append(f"▶ {text}")
             else:
-                self.log_view.appendPlainText(f"[{level}] {text}")
-            self.log_view.moveCursor(QtGui.QTextCursor.End)
-        
+                self._log_buffer.append(f"[{level}] {text}")
+
         # Lỗi -> tab Errors
         if is_error and hasattr(self, 'errors_view') and self.errors_view:
-            self.errors_view.appendPlainText(f"[{level}] {text}")
-            self.errors_view.moveCursor(QtGui.QTextCursor.End)
+            self._errors_buffer.append(f"[{level}] {text}")
             if hasattr(self, 'log_tabs'):
                 self.log_tabs.setTabText(2, "⚠️ Errors ●")
 
@@ -2689,12 +3305,14 @@ class MainWindow(QtWidgets.QMainWindow):
                 QtCore.QTimer.singleShot(2000, lambda: self.copy_log_btn.setText("📋"))
 
     def clear_log(self):
+        self._log_buffer.clear()
         if self.log_view:
             self.log_view.clear()
 
     def clear_errors(self):
         """Xóa tab Errors"""
         if hasattr(self, 'errors_view') and self.errors_view:
+            self._errors_buffer.clear()
             self.errors_view.clear()
             if hasattr(self, 'log_tabs'):
                 self.log_tabs.setTabText(2, "⚠️ Errors")
@@ -2702,6 +3320,7 @@ class MainWindow(QtWidgets.QMainWindow):
     def clear_srt_log(self):
         """Xóa tab SRT"""
         if hasattr(self, 'srt_view') and self.srt_view:
+            self._srt_buffer.clear()
             self.srt_view.clear()
             self.srt_count = 0
             if hasattr(self, 'log_tabs'):
@@ -2712,32 +3331,77 @@ class MainWindow(QtWidgets.QMainWindow):
         if not hasattr(self, 'history_table'):
             return
         
-        self.history_table.setRowCount(0)
         folder = self.folder_edit.text().strip()
         if not folder or not os.path.exists(folder):
+            self.history_model.set_rows([])
+            self._history_state_key = None
+            return
+
+        # Không có gì đổi từ lần refresh trước -> giữ nguyên bảng, khỏi
+        # re-parse + reset model. Một lần scandir Subtitles thay cho chuỗi
+        # exists()/stat() riêng cho từng artifact
+        subs_dir = os.path.join(folder, "Subtitles")
+        try:
+            with os.scandir(subs_dir) as it:
+                subs_entries = {e.name: e for e in it}
+        except OSError:
+            subs_entries = {}
+
+        def _entry_mtime(name: str) -> float:
+            entry = subs_entries.get(name)
+            if entry is None:
+                return 0.0
+            try:
+                return entry.stat().st_mtime
+            except OSError:
+                return 0.0
+
+        try:
+            index_mtime = os.stat(os.path.join(subs_dir, "history", "index.json")).st_mtime
+        except OSError:
+            index_mtime = 0.0
+
+        state_key = (
+            folder,
+            _entry_mtime("processed_files.log"),
+            _entry_mtime("logs"),
+            index_mtime,
+        )
+        if state_key == self._history_state_key:
             return
         
-        # Auto-migrate: nếu có data cũ và chưa có history mới, migrate
+        # Auto-migrate: nếu có data cũ và chưa có history mới, migrate.
+        # Manager được cache theo folder + mtime của nguồn - refresh khi
+        # không có gì đổi chỉ còn hiển thị, không re-scan/migrate lại disk
         try:
             from mkvprocessor.history_manager import HistoryManager
-            history = HistoryManager(os.path.join(folder, "Subtitles"))
-            
-            # Import từ legacy log nếu có
+
             legacy_log = os.path.join(folder, "Subtitles", "processed_files.log")
-            if os.path.exists(legacy_log):
-                imported = history.import_legacy_log(legacy_log)
-                if imported > 0:
-                    self.log_message(f"Đã migrate {imported} entries từ processed_files.log", "INFO")
-            
-            # Import từ logs/*.json nếu có
             logs_dir = os.path.join(folder, "Subtitles", "logs")
-            if os.path.exists(logs_dir):
-                imported = history.import_json_logs(logs_dir)
-                if imported > 0:
-                    self.log_message(f"Đã migrate {imported} entries từ logs/*.json", "INFO")
-            
-            # Lưu index
-            history.save_index()
+
+            legacy_mtime = _entry_mtime("processed_files.log")
+            logs_mtime = _entry_mtime("logs")
+            cached = self._history_cache.get(folder)
+            if cached and cached[1] == legacy_mtime and cached[2] == logs_mtime:
+                history = cached[0]
+            else:
+                history = HistoryManager(os.path.join(folder, "Subtitles"))
+
+                # Import từ legacy log nếu có
+                if "processed_files.log" in subs_entries:
+                    imported = history.import_legacy_log(legacy_log)
+                    if imported > 0:
+                        self.log_message(f"Đã migrate {imported} entries từ processed_files.log", "INFO")
+
+                # Import từ logs/*.json nếu có
+                if "logs" in subs_entries:
+                    imported = history.import_json_logs(logs_dir)
+                    if imported > 0:
+                        self.log_message(f"Đã migrate {imported} entries từ logs/*.json", "INFO")
+
+                # Lưu index
+                history.save_index()
+                self._history_cache[folder] = (history, legacy_mtime, logs_mtime)
             
             # Lấy entries từ history manager
             entries = history.get_all_entries()
@@ -2747,52 +3411,65 @@ class MainWindow(QtWidgets.QMainWindow):
             
             # 1. Đọc từ processed_files.log
             log_file = os.path.join(folder, "Subtitles", "processed_files.log")
-            if os.path.exists(log_file):
+            if "processed_files.log" in subs_entries:
                 try:
+                    # Đọc cả file một lần rồi split trong C thay vì loop
+                    # Python per-line - log lịch sử có thể rất lớn
                     with open(log_file, "r", encoding="utf-8") as f:
-                        for line in f:
-                            parts = line.strip().split("|")
-                            if len(parts) >= 2:
-                                entries.append({
-                                    "old_name": parts[0],
-                                    "new_name": parts[1],
-                                    "time": parts[2] if len(parts) > 2 else "",
-                                    "signature": parts[3] if len(parts) > 3 else ""
-                                })
+                        rows = [line.split("|") for line in f.read().splitlines() if line]
+                    entries.extend(
+                        {
+                            "old_name": parts[0],
+                            "new_name": parts[1],
+                            "time": parts[2] if len(parts) > 2 else "",
+                            "signature": parts[3] if len(parts) > 3 else "",
+                        }
+                        for parts in rows
+                        if len(parts) >= 2
+                    )
                 except Exception:
                     pass
         
-            # 2. Đọc từ logs/*.json
-            logs_dir = Path(folder) / "Subtitles" / "logs"
-            if logs_dir.exists():
-                for json_file in logs_dir.glob("*.json"):
-                    try:
-                        with open(json_file, "r", encoding="utf-8") as f:
-                            data = json.load(f)
-                            if isinstance(data, list):
-                                for entry in data:
-                                    entries.append({
-                                        "old_name": entry.get("old_name", ""),
-                                        "new_name": entry.get("new_name", ""),
-                                        "time": entry.get("timestamp", ""),
-                                        "signature": entry.get("signature", "")
-                                    })
-                    except Exception:
-                        pass
+            # 2. Đọc từ logs/*.json (qua parse cache theo mtime)
+            logs_dir = os.path.join(folder, "Subtitles", "logs")
+            try:
+                with os.scandir(logs_dir) as it:
+                    json_entries = [e for e in it if e.name.endswith(".json")]
+            except OSError:
+                json_entries = []
+            for json_entry in json_entries:
+                try:
+                    mtime_ns = json_entry.stat().st_mtime_ns
+                except OSError:
+                    continue
+                data = _load_json_log(json_entry.path, mtime_ns)
+                if isinstance(data, list):
+                    entries.extend(
+                        {
+                            "old_name": entry.get("old_name", ""),
+                            "new_name": entry.get("new_name", ""),
+                            "time": entry.get("timestamp", ""),
+                            "signature": entry.get("signature", ""),
+                        }
+                        for entry in data
+                    )
         
         # Sắp xếp theo thời gian (mới nhất trước)
         entries.sort(key=lambda x: x.get("time", ""), reverse=True)
         
-        # Hiển thị trong bảng
-        self.history_table.setRowCount(len(entries))
-        for row, entry in enumerate(entries):
-            self.history_table.setItem(row, 0, QtWidgets.QTableWidgetItem(entry.get("old_name", "")))
-            self.history_table.setItem(row, 1, QtWidgets.QTableWidgetItem(entry.get("new_name", "")))
-            self.history_table.setItem(row, 2, QtWidgets.QTableWidgetItem(entry.get("time", "")))
-            sig = entry.get("signature", "")
-            # Rút gọn signature
-            short_sig = sig[:20] + "..." if len(sig) > 20 else sig
-            self.history_table.setItem(row, 3, QtWidgets.QTableWidgetItem(short_sig))
+        # Hiển thị trong bảng - build rows rồi reset model một lần;
+        # signature giữ nguyên, view elide lúc paint
+        rows = [
+            (
+                entry.get("old_name", ""),
+                entry.get("new_name", ""),
+                entry.get("time", ""),
+                entry.get("signature", ""),
+            )
+            for entry in entries
+        ]
+        self.history_model.set_rows(rows)
+        self._history_state_key = state_key
 
     def open_logs_folder(self):
         folder = self.folder_edit.text().strip()
@@ -2843,8 +3520,12 @@ class MainWindow(QtWidgets.QMainWindow):
             "use_ssd_cache": self.use_ssd_cache_cb.isChecked() if hasattr(self, 'use_ssd_cache_cb') else True,
             "temp_cache_dir": self.cache_dir_edit.text().strip() if hasattr(self, 'cache_dir_edit') else "",
         })
-        save_user_config(self.config)
+        self._schedule_save()
+        self._raw_config_cache = None  # rebuild sẽ đọc lại config vừa lưu
         self.settings_status.setText("✅ Saved")
+        # User vừa đổi cấu hình - probe lại thay vì dùng cache
+        self._ffmpeg_cache = None
+        self._ram_cache = None
         self.refresh_system_status()
 
     def test_token(self):
@@ -2853,8 +3534,8 @@ class MainWindow(QtWidgets.QMainWindow):
             QtWidgets.QMessageBox.warning(self, "Error", "Token and repo are required.")
             return
         try:
-            r = requests.get(f"https://api.github.com/repos/{repo}", 
-                           headers={"Authorization": f"Bearer {token}"}, timeout=10)
+            r = _HTTP.get(f"https://api.github.com/repos/{repo}", 
+                          headers={"Authorization": f"Bearer {token}"}, timeout=10)
             if r.status_code == 200:
                 self.show_info_message("OK", "Token hợp lệ!")
             else:
@@ -2864,9 +3545,15 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def refresh_system_status(self):
         """Refresh system status - lazy load script module"""
+        now = time.monotonic()
         try:
-            script = self._get_script_module()
-            ok = script.check_ffmpeg_available()
+            # ffmpeg probe là một lần spawn subprocess - cache 15 phút
+            if self._ffmpeg_cache is not None and now - self._ffmpeg_cache[0] < 900:
+                ok = self._ffmpeg_cache[1]
+            else:
+                script = self._get_script_module()
+                ok = script.check_ffmpeg_available()
+                self._ffmpeg_cache = (now, ok)
             self.status_labels["ffmpeg"].setText(f"FFmpeg: {'✓' if ok else '✗'}")
             self.status_labels["ffmpeg"].setStyleSheet(f"color: {get_status_color('success' if ok else 'warning')};")
         except Exception as e:
@@ -2874,8 +3561,12 @@ class MainWindow(QtWidgets.QMainWindow):
             self.status_labels["ffmpeg"].setText("FFmpeg: ?")
 
         try:
-            script = self._get_script_module()
-            ram = script.check_available_ram()
+            if self._ram_cache is not None and now - self._ram_cache[0] < 30:
+                ram = self._ram_cache[1]
+            else:
+                script = self._get_script_module()
+                ram = script.check_available_ram()
+                self._ram_cache = (now, ram)
             self.status_labels["ram"].setText(f"RAM: {ram:.1f}GB")
             self.status_labels["ram"].setStyleSheet(f"color: {get_status_color('info')};")
         except Exception as e:
@@ -2952,7 +3643,6 @@ class MainWindow(QtWidgets.QMainWindow):
                 
                 # Show message box with theme
                 msg = QtWidgets.QMessageBox(self)
-                msg.setStyleSheet(DARK_THEME)  # Apply dark theme
                 msg.setIcon(QtWidgets.QMessageBox.Information)
                 msg.setWindowTitle("Update Available")
                 msg.setText(f"New version {version} is available!")
@@ -3058,6 +3748,10 @@ class MainWindow(QtWidgets.QMainWindow):
         def progress_callback(url, downloaded, total):
             if total > 0:
                 percent = int((downloaded / total) * 100)
+                # Chỉ cập nhật khi percent thực sự đổi - download emit tick
+                # dày hơn nhiều so với 100 nấc hiển thị
+                if percent == self.update_progress_bar.value():
+                    return
                 self.update_progress_bar.setValue(percent)
                 self.update_status_label.setText(
                     f"Downloading: {downloaded / 1024 / 1024:.1f} MB / {total / 1024 / 1024:.1f} MB"
@@ -3152,7 +3846,7 @@ class MainWindow(QtWidgets.QMainWindow):
         """Handle beta/stable selection change."""
         prefer_beta = self.beta_stable_combo.currentData() == "beta"
         self.config["prefer_beta_updates"] = prefer_beta
-        save_user_config(self.config)
+        self._schedule_save()
         
         # Update UpdateManager preference
         update_manager = self._get_update_manager()
@@ -3162,7 +3856,7 @@ class MainWindow(QtWidgets.QMainWindow):
     def on_auto_download_changed(self, checked: bool):
         """Handle auto download checkbox change."""
         self.config["auto_download_updates"] = checked
-        save_user_config(self.config)
+        self._schedule_save()
     
     def auto_check_for_updates(self):
         """Silently check for updates on startup (non-blocking)."""
@@ -3229,6 +3923,8 @@ class MainWindow(QtWidgets.QMainWindow):
                 if total > 0:
                     percent = int((downloaded / total) * 100)
                     if hasattr(self, 'update_progress_bar'):
+                        if percent == self.update_progress_bar.value():
+                            return
                         self.update_progress_bar.setVisible(True)
                         self.update_progress_bar.setValue(percent)
                     if hasattr(self, 'update_status_label'):
@@ -4,93 +4,149 @@ MetadataLoader - QThread để load metadata của MKV files trong background.
 from __future__ import annotations
 
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 from PySide6 import QtCore
 
+# Hỗ trợ import khi chạy như package module hoặc chạy trực tiếp file
+try:
+    from .file_options import AudioTrack, SubtitleTrack
+except ImportError:
+    from file_options import AudioTrack, SubtitleTrack  # type: ignore
+
+# Dict rỗng dùng chung cho stream không có tags - tránh cấp phát {} mới
+_EMPTY_TAGS: dict = {}
+
+# Ngưỡng resolution (min_width, min_height, label) - duyệt từ cao xuống
+_RES_BUCKETS = (
+    (7680, 4320, "8K"),
+    (3840, 2160, "4K"),
+    (2560, 1440, "2K"),
+    (1920, 1080, "FHD"),
+    (1280, 720, "HD"),
+    (720, 480, "480p"),
+)
+
+
+def resolution_bucket(w: int, h: int) -> str:
+    """Phân loại resolution theo bảng ngưỡng."""
+    return next((label for wt, ht, label in _RES_BUCKETS if w >= wt or h >= ht), f"{w}p")
+
+
+def parse_probe_metadata(probe: dict) -> dict:
+    """Parse một probe dict thành payload {subs, audios, resolution, year}.
+
+    Chạy được trên worker thread - main thread chỉ cần gán kết quả vào
+    FileOptions, không phải parse lại.
+    """
+    subs = []
+    audios = []
+    for order, stream in enumerate(probe.get("streams", [])):
+        ctype = stream.get("codec_type")
+        if ctype == "subtitle":
+            tags = stream.get("tags") or _EMPTY_TAGS
+            subs.append(SubtitleTrack(
+                idx=stream.get("index", -1),
+                lang=tags.get("language", "und"),
+                title=tags.get("title", ""),
+                codec=stream.get("codec_name", ""),
+            ))
+        elif ctype == "audio":
+            tags = stream.get("tags") or _EMPTY_TAGS
+            bitrate_raw = stream.get("bit_rate") or tags.get("BPS")
+            try:
+                bitrate = int(bitrate_raw) if bitrate_raw else 0
+            except (TypeError, ValueError):
+                bitrate = 0
+            audios.append(AudioTrack(
+                idx=stream.get("index", -1),
+                channels=stream.get("channels", 0),
+                lang=tags.get("language", "und"),
+                title=tags.get("title", ""),
+                bitrate=bitrate,
+                order=order,
+            ))
+
+    # Resolution: width/height trực tiếp, fallback coded_width/coded_height
+    resolution = "unknown"
+    video_stream = next(
+        (s for s in probe.get("streams", []) if s.get("codec_type") == "video"), None
+    )
+    if video_stream:
+        w = h = None
+        for w_key, h_key in (("width", "height"), ("coded_width", "coded_height")):
+            if w_key in video_stream and h_key in video_stream:
+                try:
+                    w = int(video_stream[w_key])
+                    h = int(video_stream[h_key])
+                    break
+                except (ValueError, TypeError):
+                    w = h = None
+        if w and h:
+            resolution = resolution_bucket(w, h)
+
+    format_tags = probe.get("format", {}).get("tags", {})
+    year = format_tags.get("year", "").strip()
+
+    return {"subs": subs, "audios": audios, "resolution": resolution, "year": year}
+
 
 class MetadataLoader(QtCore.QThread):
-    """Worker thread để load metadata của các file MKV trong background."""
-    
-    metadata_loaded_signal = QtCore.Signal(str, bool)  # filepath, success
-    
+    """Worker thread để load metadata của các file MKV trong background.
+
+    ffprobe là process riêng nên chạy song song k worker cho tốc độ gần
+    tuyến tính; mỗi worker thread chỉ block chờ subprocess. Kết quả được
+    gộp thành lô (16 file hoặc 250ms) để main thread nhận một lần dispatch
+    cho cả lô thay vì N lần queued signal; payload đã parse sẵn.
+    """
+
+    # list[(filepath, payload|None)]
+    metadata_batch_loaded_signal = QtCore.Signal(list)
+
     def __init__(self, file_paths: list[str], parent=None):
         super().__init__(parent)
         self.file_paths = file_paths
-    
+
+    @staticmethod
+    def _probe_one(file_path: str) -> dict:
+        """Probe + parse một file (qua persistent cache) - trên worker thread."""
+        from mkvprocessor.probe_cache import probe_file_cached
+        return parse_probe_metadata(probe_file_cached(file_path, minimal=True))
+
     def run(self):
-        """Load metadata cho từng file trong background."""
-        for file_path in self.file_paths:
-            if self.isInterruptionRequested():
-                break
-            
-            if not file_path or not os.path.exists(file_path):
-                continue
-            
-            try:
-                # Import và load metadata
-                from mkvprocessor.ffmpeg_helper import probe_file
-                probe = probe_file(file_path)
-                
-                # Parse tracks
-                subs = []
-                audios = []
-                
-                # Parse subtitle tracks
-                for stream in probe.get("streams", []):
-                    if stream.get("codec_type") == "subtitle":
-                        subs.append((
-                            stream.get("index", -1),
-                            stream.get("tags", {}).get("language", "und"),
-                            stream.get("tags", {}).get("title", ""),
-                            stream.get("codec_name", "unknown"),
-                        ))
-                
-                # Parse audio tracks
-                for order, stream in enumerate(probe.get("streams", [])):
-                    if stream.get("codec_type") == "audio":
-                        bitrate_raw = stream.get("bit_rate") or stream.get("tags", {}).get("BPS")
-                        try:
-                            bitrate = int(bitrate_raw) if bitrate_raw else 0
-                        except (TypeError, ValueError):
-                            bitrate = 0
-                        audios.append((
-                            stream.get("index", -1),
-                            stream.get("channels", 0),
-                            stream.get("tags", {}).get("language", "und"),
-                            stream.get("tags", {}).get("title", ""),
-                            bitrate,
-                            order,
-                        ))
-                
-                # Parse resolution
-                video_stream = next((s for s in probe["streams"] if s["codec_type"] == "video"), None)
-                resolution = "?"
-                if video_stream and "width" in video_stream and "height" in video_stream:
-                    w, h = int(video_stream["width"]), int(video_stream["height"])
-                    if w >= 7680 or h >= 4320:
-                        resolution = "8K"
-                    elif w >= 3840 or h >= 2160:
-                        resolution = "4K"
-                    elif w >= 2560 or h >= 1440:
-                        resolution = "2K"
-                    elif w >= 1920 or h >= 1080:
-                        resolution = "FHD"
-                    elif w >= 1280 or h >= 720:
-                        resolution = "HD"
-                    elif w >= 720 or h >= 480:
-                        resolution = "480p"
-                    else:
-                        resolution = f"{w}p"
-                
-                # Parse year
-                format_tags = probe.get("format", {}).get("tags", {})
-                year = format_tags.get("year", "").strip()
-                
-                # Emit signal với metadata (main_window sẽ gọi ensure_options_metadata để cập nhật options)
-                # Chúng ta chỉ parse ở đây để giảm tải cho main thread
-                self.metadata_loaded_signal.emit(file_path, True)
-                
-            except Exception as e:
-                # Emit với success=False để đánh dấu lỗi
-                print(f"[WARNING] Không thể đọc metadata của {os.path.basename(file_path)}: {e}")
-                self.metadata_loaded_signal.emit(file_path, False)
+        """Load metadata cho các file song song qua một thread pool."""
+        paths = [p for p in self.file_paths if p and os.path.exists(p)]
+        if not paths:
+            return
+
+        pending: list[tuple[str, object]] = []
+        last_flush = time.monotonic()
+
+        def flush():
+            nonlocal last_flush
+            if pending:
+                self.metadata_batch_loaded_signal.emit(pending.copy())
+                pending.clear()
+            last_flush = time.monotonic()
+
+        # Worker chỉ block chờ ffprobe (I/O-bound) nên floor 4 kể cả máy ít core
+        max_workers = min(8, max(4, os.cpu_count() or 1))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self._probe_one, path): path for path in paths}
+            for future in as_completed(futures):
+                if self.isInterruptionRequested():
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    break
+
+                path = futures[future]
+                try:
+                    payload = future.result()
+                except Exception as e:
+                    print(f"[WARNING] Không thể đọc metadata của {os.path.basename(path)}: {e}")
+                    payload = None
+                pending.append((path, payload))
+                if len(pending) >= 16 or time.monotonic() - last_flush > 0.25:
+                    flush()
 
+        flush()
@@ -65,6 +65,15 @@ QLabel {
     color: #94a3b8;
 }
 
+#settingsHint {
+    color: #9ca3af;
+    font-size: 11px;
+}
+
+#settingsStatusHint {
+    color: #9ca3af;
+}
+
 /* Inputs */
 QLineEdit {
     background: #0d1117;
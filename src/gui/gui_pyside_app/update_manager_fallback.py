@@ -34,12 +34,15 @@ GITHUB_RELEASES_URL = f"https://api.github.com/repos/{GITHUB_REPO}/releases"
 class UpdateManager:
     """Manages application updates from GitHub Releases."""
     
-    def __init__(self):
+    def __init__(self, session=None):
         self.repo = GITHUB_REPO
         self.api_url = GITHUB_API_URL
         self.releases_url = GITHUB_RELEASES_URL
         self._current_version = None  # Lazy load
         self._prefer_beta = False  # Default to stable releases
+        # Session dùng chung (connection pooling) - mặc định session riêng
+        # để API cũ UpdateManager() vẫn chạy
+        self._session = session or requests.Session()
         
     def _get_version_from_file(self) -> Optional[str]:
         """Try to get version from bundled version.txt file."""
@@ -96,7 +99,7 @@ class UpdateManager:
     def _get_version_from_github_latest(self) -> Optional[str]:
         """Get latest version from GitHub releases (not current, but latest available)."""
         try:
-            response = requests.get(self.api_url, timeout=5)
+            response = self._session.get(self.api_url, timeout=5)
             response.raise_for_status()
             release_data = response.json()
             tag_name = release_data.get("tag_name", "")
@@ -206,7 +209,7 @@ class UpdateManager:
             want_beta = prefer_beta if prefer_beta is not None else self._prefer_beta
             
             if want_beta:
-                response = requests.get(self.releases_url, timeout=timeout)
+                response = self._session.get(self.releases_url, timeout=timeout)
                 response.raise_for_status()
                 releases = response.json()
                 beta_releases = [
@@ -214,13 +217,13 @@ class UpdateManager:
                     if "beta" in r.get("tag_name", "").lower() or "beta" in r.get("name", "").lower()
                 ]
                 if not beta_releases:
-                    response = requests.get(self.api_url, timeout=timeout)
+                    response = self._session.get(self.api_url, timeout=timeout)
                     response.raise_for_status()
                     release_data = response.json()
                 else:
                     release_data = beta_releases[0]
             else:
-                response = requests.get(self.api_url, timeout=timeout)
+                response = self._session.get(self.api_url, timeout=timeout)
                 response.raise_for_status()
                 release_data = response.json()
             
@@ -283,7 +286,7 @@ class UpdateManager:
             download_path = temp_dir / file_name
             print(f"[UPDATE] Downloading {file_name} ({file_size / 1024 / 1024:.2f} MB)...")
             
-            response = requests.get(download_url, stream=True, timeout=60)
+            response = self._session.get(download_url, stream=True, timeout=60)
             response.raise_for_status()
             
             total_size = int(response.headers.get('content-length', file_size))
@@ -72,6 +72,10 @@ class Worker(QtCore.QThread):
                     continue
             if script is None:
                 raise ImportError("Cannot import processing_core module")
+            # Reset cờ hủy của lần chạy trước (nếu backend hỗ trợ)
+            cancel_event = getattr(script, "CANCEL_EVENT", None)
+            if cancel_event is not None:
+                cancel_event.clear()
             selected_backup = os.environ.get("MKV_SELECTED_FILES")
             if self.selected_files:
                 os.environ["MKV_SELECTED_FILES"] = json.dumps(self.selected_files)
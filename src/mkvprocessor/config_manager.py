@@ -28,6 +28,8 @@ DEFAULT_CONFIG: Dict[str, Any] = {
     "output_folder_subtitles": "",   # Thư mục subtitles
     "output_folder_original": "",    # Thư mục original
     "language": "vi",  # Language code: 'en' for English, 'vi' for Vietnamese
+    "log_max_lines": 5000,           # Max lines kept in the GUI log views
+
     # SSD Caching settings
     "use_ssd_cache": True,           # Enable SSD caching/staging
     "temp_cache_dir": "",            # Custom cache directory (empty = system temp)
@@ -91,20 +93,38 @@ def load_user_config() -> Dict[str, Any]:
     return config
 
 
+# Cache for load_raw_user_config keyed by file mtime - the Settings tab
+# re-reads the raw config on every rebuild, so avoid re-parsing when unchanged.
+_RAW_CFG_CACHE: Dict[str, Any] = {"mtime": None, "data": None}
+
+
 def load_raw_user_config() -> Dict[str, Any]:
     """Load configuration from file (if exists), without merging with defaults.
-    
+
+    The parsed result is cached and only re-read when the file's mtime
+    changes (or after save_user_config / reset_config).
+
     Returns:
         Dictionary containing raw configuration from file, or empty dict if file
         doesn't exist or is invalid.
     """
     path = get_config_path()
-    if path.exists():
-        try:
-            return json.loads(path.read_text(encoding="utf-8"))
-        except (json.JSONDecodeError, IOError) as exc:
-            logger.error(f"Failed to read config file: {exc}")
-    return {}
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        _RAW_CFG_CACHE["mtime"] = None
+        _RAW_CFG_CACHE["data"] = None
+        return {}
+    if _RAW_CFG_CACHE["mtime"] == mtime and _RAW_CFG_CACHE["data"] is not None:
+        return _RAW_CFG_CACHE["data"]
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (json.JSONDecodeError, IOError) as exc:
+        logger.error(f"Failed to read config file: {exc}")
+        return {}
+    _RAW_CFG_CACHE["mtime"] = mtime
+    _RAW_CFG_CACHE["data"] = data
+    return data
 
 
 def save_user_config(data: Dict[str, Any]) -> None:
@@ -117,6 +137,9 @@ def save_user_config(data: Dict[str, Any]) -> None:
     merged.update(data)
     path = get_config_path()
     path.write_text(json.dumps(merged, ensure_ascii=False, indent=2), encoding="utf-8")
+    # Invalidate raw-config cache so the next load_raw_user_config re-reads
+    _RAW_CFG_CACHE["mtime"] = None
+    _RAW_CFG_CACHE["data"] = None
 
 
 def reset_config() -> None:
@@ -127,3 +150,5 @@ def reset_config() -> None:
     path = get_config_path()
     if path.exists():
         path.unlink()
+    _RAW_CFG_CACHE["mtime"] = None
+    _RAW_CFG_CACHE["data"] = None
@@ -209,28 +209,68 @@ def get_ffmpeg_command(cmd: Union[List[str], str]) -> Union[List[str], str]:
     return cmd
 
 
+# Only the fields the GUI actually consumes - keeps ffprobe's JSON output
+# (and the Python-side parse) roughly 10x smaller than a full probe.
+_MINIMAL_SHOW_ENTRIES = (
+    "stream=index,codec_type,codec_name,channels,bit_rate,"
+    "width,height,coded_width,coded_height"
+    ":stream_tags=language,title,BPS"
+    ":format_tags=year"
+)
+
+
 def probe_file(file_path: str) -> dict:
     """Probe file with ffprobe, hiding console window on Windows.
-    
+
     This is a replacement for ffmpeg.probe() that doesn't show CMD window.
-    
+
     Args:
         file_path: Path to the video file to probe.
-    
+
     Returns:
         Dictionary containing FFprobe output (format and streams info).
-    
+
     Raises:
         FileNotFoundError: If the input file doesn't exist.
         RuntimeError: If ffprobe fails or returns invalid output.
         subprocess.TimeoutExpired: If ffprobe times out (30 seconds).
     """
+    return _run_probe(file_path, ['-show_format', '-show_streams'])
+
+
+def probe_file_minimal(file_path: str) -> dict:
+    """Probe only the fields needed for track/resolution display.
+
+    Same contract as probe_file(), but restricts ffprobe output via
+    -show_entries so less JSON is produced, moved and parsed, and caps
+    -probesize/-analyzeduration so ffprobe stops after the container header
+    instead of scanning deep into the file.
+
+    Args:
+        file_path: Path to the video file to probe.
+
+    Returns:
+        Dictionary with trimmed streams/format info.
+    """
+    probe = _run_probe(file_path, [
+        '-probesize', '1M',
+        '-analyzeduration', '0',
+        '-show_entries', _MINIMAL_SHOW_ENTRIES,
+    ])
+    if not probe.get("streams"):
+        # Header lạ/cần phân tích sâu hơn - fallback full probe
+        return probe_file(file_path)
+    return probe
+
+
+def _run_probe(file_path: str, show_args: List[str]) -> dict:
+    """Run ffprobe with the given -show_* arguments and parse its JSON."""
     import json
-    
+
     # Check if file exists
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
-    
+
     # Find ffprobe binary
     ffprobe_path = find_ffprobe_binary()
     if ffprobe_path is None:
@@ -250,16 +290,15 @@ def probe_file(file_path: str) -> dict:
                 "ffprobe không được tìm thấy. "
                 "Vui lòng đảm bảo ffprobe.exe có trong thư mục ffmpeg_bin hoặc trong PATH."
             )
-    
+
     cmd = [
         ffprobe_path,
         '-v', 'error',  # Show errors for debugging
         '-print_format', 'json',
-        '-show_format',
-        '-show_streams',
+        *show_args,
         file_path
     ]
-    
+
     try:
         logger.debug(f"Running ffprobe: {' '.join(cmd)}")
         result = subprocess.run(
@@ -3,6 +3,7 @@ Internationalization (i18n) support for MKV Processor.
 
 Provides translation functionality with language switching support.
 """
+import functools
 import json
 import logging
 import sys
@@ -185,9 +186,13 @@ def t(key: str, **kwargs) -> str:
     return text
 
 
+@functools.lru_cache(maxsize=1)
 def get_supported_languages() -> Dict[str, str]:
     """Get dictionary of supported languages.
-    
+
+    The result is memoized (the language set is fixed at import time),
+    so repeated calls from UI rebuilds don't re-copy the dict.
+
     Returns:
         Dictionary mapping language codes to language names
     """
@@ -823,16 +823,27 @@ def main(input_folder=None, force_reprocess: Optional[bool] = None, dry_run: boo
         except Exception as exc:
             logger.error(f"[LOG] Cannot read converted log: {exc}")
 
-    # Read file options from GUI
+    # Read file options from GUI - ưu tiên file tạm (env block có giới hạn
+    # kích thước), fallback biến môi trường cũ
     file_options_map = {}  # {file_path: options_dict}
-    options_env = os.environ.get("MKV_FILE_OPTIONS")
-    if options_env:
+    options_data = None
+    options_path = os.environ.get("MKV_FILE_OPTIONS_PATH")
+    if options_path:
         try:
-            options_data = json.loads(options_env)
-            for file_path, opts in options_data.items():
-                file_options_map[os.path.abspath(file_path)] = opts
-        except json.JSONDecodeError:
-            logger.warning("[GUI] Cannot parse file options. Will use defaults.")
+            with open(options_path, "r", encoding="utf-8") as f:
+                options_data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            logger.warning("[GUI] Cannot read file options file. Will use defaults.")
+    else:
+        options_env = os.environ.get("MKV_FILE_OPTIONS")
+        if options_env:
+            try:
+                options_data = json.loads(options_env)
+            except json.JSONDecodeError:
+                logger.warning("[GUI] Cannot parse file options. Will use defaults.")
+    if options_data:
+        for file_path, opts in options_data.items():
+            file_options_map[os.path.abspath(file_path)] = opts
 
     try:
         mkv_files = [f for f in os.listdir(input_folder) if f.lower().endswith(".mkv")]
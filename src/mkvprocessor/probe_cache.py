@@ -0,0 +1,134 @@
+"""Persistent ffprobe result cache keyed by (path, mtime, size).
+
+Re-probing an unchanged file costs a full ffprobe subprocess spawn plus JSON
+parse (~hundreds of ms per file). This module stores probe results in a small
+SQLite database so warm starts skip the external process entirely; a cache
+hit only costs an os.stat.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Single shared connection, WAL mode so the background MetadataLoader thread
+# and the GUI thread can read/write concurrently; serialized with a lock.
+_conn: Optional[sqlite3.Connection] = None
+_lock = threading.Lock()
+
+
+def get_cache_dir() -> Path:
+    """Get the cache directory path.
+
+    Returns:
+        Path to the cache directory. Creates the directory if it doesn't exist.
+        On Windows: %LOCALAPPDATA%/MKVProcessor
+        On Linux/macOS: ~/.cache/MKVProcessor or $XDG_CACHE_HOME/MKVProcessor
+    """
+    if os.name == "nt":
+        base = Path(os.getenv("LOCALAPPDATA", str(Path.home() / "AppData" / "Local")))
+    elif xdg := os.getenv("XDG_CACHE_HOME"):
+        base = Path(xdg)
+    else:
+        base = Path.home() / ".cache"
+    cache_dir = base / "MKVProcessor"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+def get_cache_db_path() -> Path:
+    """Get the path to the probe cache database."""
+    return get_cache_dir() / "probe.sqlite"
+
+
+def _get_conn() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        conn = sqlite3.connect(str(get_cache_db_path()), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS probe_cache ("
+            "path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, probe_json TEXT)"
+        )
+        conn.commit()
+        _conn = conn
+    return _conn
+
+
+def get_cached_probe(path: str, mtime_ns: int, size: int) -> Optional[Dict[str, Any]]:
+    """Look up a stored probe result.
+
+    Returns:
+        The cached probe dict, or None on miss / any cache error.
+    """
+    try:
+        with _lock:
+            row = _get_conn().execute(
+                "SELECT probe_json FROM probe_cache WHERE path=? AND mtime_ns=? AND size=?",
+                (path, mtime_ns, size),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+    except Exception as exc:
+        logger.debug(f"Probe cache lookup failed for {path}: {exc}")
+        return None
+
+
+def store_probe(path: str, mtime_ns: int, size: int, probe: Dict[str, Any]) -> None:
+    """Store a probe result; cache errors are logged and ignored."""
+    try:
+        payload = json.dumps(probe, ensure_ascii=False)
+        with _lock:
+            conn = _get_conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO probe_cache (path, mtime_ns, size, probe_json) "
+                "VALUES (?, ?, ?, ?)",
+                (path, mtime_ns, size, payload),
+            )
+            conn.commit()
+    except Exception as exc:
+        logger.debug(f"Probe cache store failed for {path}: {exc}")
+
+
+def probe_file_cached(file_path: str, minimal: bool = False) -> Dict[str, Any]:
+    """Probe a file through the persistent cache.
+
+    Falls back to a real ffprobe call on cache miss (or any cache error)
+    and stores the fresh result for the next run.
+
+    Args:
+        file_path: Path to the video file to probe.
+        minimal: Use probe_file_minimal() (trimmed -show_entries output)
+            instead of a full probe. Minimal and full results are cached
+            under separate keys so they never shadow each other.
+
+    Raises:
+        Whatever probe_file raises on a miss (FileNotFoundError, RuntimeError).
+    """
+    st = os.stat(file_path)
+    abs_path = os.path.abspath(file_path)
+    db_key = f"minimal::{abs_path}" if minimal else abs_path
+    cached = get_cached_probe(db_key, st.st_mtime_ns, st.st_size)
+    if cached is not None:
+        return cached
+
+    from .ffmpeg_helper import probe_file, probe_file_minimal
+    probe = (probe_file_minimal if minimal else probe_file)(file_path)
+    store_probe(db_key, st.st_mtime_ns, st.st_size, probe)
+    return probe
+
+
+def clear_cache() -> None:
+    """Drop all cached probe results (e.g. after an ffmpeg upgrade)."""
+    try:
+        with _lock:
+            conn = _get_conn()
+            conn.execute("DELETE FROM probe_cache")
+            conn.commit()
+    except Exception as exc:
+        logger.debug(f"Probe cache clear failed: {exc}")
@@ -10,6 +10,7 @@ import json
 import logging
 import subprocess
 import platform
+import threading
 import re
 import datetime
 import tempfile
@@ -62,6 +63,10 @@ from .video_processor import (
 from .subtitle_extractor import extract_subtitle
 from .utils.ffmpeg_runner import run_ffmpeg_command
 
+# Cooperative cancellation: GUI đặt event này khi user bấm Dừng; main() kiểm
+# tra giữa các file thay vì bị terminate() giết ngang thread
+CANCEL_EVENT = threading.Event()
+
 # Configure logging - only add StreamHandler if stdout is valid
 def setup_logging():
     """Setup logging with safe stream handling."""
@@ -718,16 +723,27 @@ def main(input_folder=None, force_reprocess: Optional[bool] = None, dry_run: boo
         except Exception as exc:
             logger.error(f"[LOG] Cannot read converted log: {exc}")
 
-    # Read file options from GUI
+    # Read file options from GUI - ưu tiên file tạm (env block có giới hạn
+    # kích thước), fallback biến môi trường cũ
     file_options_map = {}  # {file_path: options_dict}
-    options_env = os.environ.get("MKV_FILE_OPTIONS")
-    if options_env:
+    options_data = None
+    options_path = os.environ.get("MKV_FILE_OPTIONS_PATH")
+    if options_path:
         try:
-            options_data = json.loads(options_env)
-            for file_path, opts in options_data.items():
-                file_options_map[os.path.abspath(file_path)] = opts
-        except json.JSONDecodeError:
-            logger.warning("[GUI] Cannot parse file options. Will use defaults.")
+            with open(options_path, "r", encoding="utf-8") as f:
+                options_data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            logger.warning("[GUI] Cannot read file options file. Will use defaults.")
+    else:
+        options_env = os.environ.get("MKV_FILE_OPTIONS")
+        if options_env:
+            try:
+                options_data = json.loads(options_env)
+            except json.JSONDecodeError:
+                logger.warning("[GUI] Cannot parse file options. Will use defaults.")
+    if options_data:
+        for file_path, opts in options_data.items():
+            file_options_map[os.path.abspath(file_path)] = opts
 
     try:
         video_files = [
@@ -765,6 +781,9 @@ def main(input_folder=None, force_reprocess: Optional[bool] = None, dry_run: boo
 
         total_files = len(video_files)
         for file_idx, video_file in enumerate(video_files, 1):
+            if CANCEL_EVENT.is_set():
+                logger.info("[CANCEL] Đã dừng theo yêu cầu người dùng")
+                break
             file_path = os.path.join(input_folder, video_file)
             logger.info(
                 t(
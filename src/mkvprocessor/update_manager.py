@@ -31,12 +31,15 @@ GITHUB_RELEASES_URL = f"https://api.github.com/repos/{GITHUB_REPO}/releases"
 class UpdateManager:
     """Manages application updates from GitHub Releases."""
     
-    def __init__(self):
+    def __init__(self, session=None):
         self.repo = GITHUB_REPO
         self.api_url = GITHUB_API_URL
         self.releases_url = GITHUB_RELEASES_URL
         self._current_version = None  # Lazy load
         self._prefer_beta = False  # Default to stable releases
+        # Session dùng chung (connection pooling) - mặc định session riêng
+        # để API cũ UpdateManager() vẫn chạy
+        self._session = session or requests.Session()
         
     def _get_version_from_file(self) -> Optional[str]:
         """Try to get version from bundled version.txt file."""
@@ -94,7 +97,7 @@ class UpdateManager:
     def _get_version_from_github_latest(self) -> Optional[str]:
         """Get latest version from GitHub releases (not current, but latest available)."""
         try:
-            response = requests.get(self.api_url, timeout=5)
+            response = self._session.get(self.api_url, timeout=5)
             response.raise_for_status()
             release_data = response.json()
             tag_name = release_data.get("tag_name", "")
@@ -213,7 +216,7 @@ class UpdateManager:
             
             if want_beta:
                 # Get all releases and find latest beta
-                response = requests.get(self.releases_url, timeout=timeout)
+                response = self._session.get(self.releases_url, timeout=timeout)
                 response.raise_for_status()
                 releases = response.json()
                 
@@ -225,7 +228,7 @@ class UpdateManager:
                 
                 if not beta_releases:
                     # No beta releases, fall back to latest stable
-                    response = requests.get(self.api_url, timeout=timeout)
+                    response = self._session.get(self.api_url, timeout=timeout)
                     response.raise_for_status()
                     release_data = response.json()
                 else:
@@ -233,7 +236,7 @@ class UpdateManager:
                     release_data = beta_releases[0]
             else:
                 # Get latest stable release
-                response = requests.get(self.api_url, timeout=timeout)
+                response = self._session.get(self.api_url, timeout=timeout)
                 response.raise_for_status()
                 release_data = response.json()
             
@@ -327,7 +330,7 @@ class UpdateManager:
             print(f"[UPDATE] Downloading {file_name} ({file_size / 1024 / 1024:.2f} MB)...")
             
             # Download with progress
-            response = requests.get(download_url, stream=True, timeout=60)
+            response = self._session.get(download_url, stream=True, timeout=60)
             response.raise_for_status()
             
             total_size = int(response.headers.get('content-length', file_size))
@@ -0,0 +1,30 @@
+from mkvprocessor import probe_cache
+
+
+def test_probe_file_cached_hits_disk_cache(tmp_path, monkeypatch):
+    # Point the cache at a temp database
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setattr(probe_cache, "_conn", None)
+
+    video = tmp_path / "movie.mkv"
+    video.write_bytes(b"fake video")
+
+    calls = []
+
+    def fake_probe(path):
+        calls.append(path)
+        return {"streams": [{"codec_type": "video"}], "format": {}}
+
+    import mkvprocessor.ffmpeg_helper as ffmpeg_helper
+    monkeypatch.setattr(ffmpeg_helper, "probe_file", fake_probe)
+
+    first = probe_cache.probe_file_cached(str(video))
+    second = probe_cache.probe_file_cached(str(video))
+
+    assert first == second
+    assert len(calls) == 1  # second call served from the cache
+
+    # Changing the file invalidates the cached entry
+    video.write_bytes(b"fake video v2")
+    probe_cache.probe_file_cached(str(video))
+    assert len(calls) == 2